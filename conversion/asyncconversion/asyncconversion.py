@@ -0,0 +1,89 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import asyncio
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from async_conversion import AsyncConverter
+
+
+async def ConvertAll(theConverter: AsyncConverter, theSource: str, theDests: list, theTimeout: float):
+    async def ConvertOne(theDest: str):
+        aStartTime = time.perf_counter()
+        try:
+            await asyncio.wait_for(theConverter.Convert(theSource, theDest), theTimeout)
+            print(f"Converted {theDest} in {time.perf_counter() - aStartTime:.2f} s")
+            return True
+        except asyncio.TimeoutError:
+            # The job has been canceled through its progress status and no longer consumes CPU
+            print(f"Conversion to {theDest} was canceled after {time.perf_counter() - aStartTime:.2f} s")
+        except Exception as anEx:
+            print(anEx)
+        return False
+
+    # The event loop stays responsive while the conversions run in background threads
+    aResults = await asyncio.gather(*[ConvertOne(aDest) for aDest in theDests])
+    return all(aResults)
+
+def main(theSource: str, theDests: list, theTimeout: float = 600.0):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aConverter = AsyncConverter(2)
+    try:
+        anIsOK = asyncio.run(ConvertAll(aConverter, theSource, theDests, theTimeout))
+    finally:
+        aConverter.Shutdown()
+
+    print("Completed")
+    return 0 if anIsOK else 1
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <output_file> [<output_file> ...], where:")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the file to Save() the model")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDests = [os.path.abspath(aDest) for aDest in sys.argv[2:]]
+
+    sys.exit(main(aSource, aDests))
@@ -0,0 +1,220 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import time
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from conversion_parameters import ConversionParameters
+from conversion_watchdog import ConversionWatchdog
+from conversion_worker import ConversionJob, ConversionWorker
+from duplicate_inputs import DuplicateInputs
+from job_scheduler import JobScheduler
+
+
+# Input is either a directory (all files are converted, recursively) or a manifest file
+# listing one source path per line, optionally followed by a tab and a destination path.
+def CollectJobs(theInput: str, theOutputDir: str, theFormat: str, theParams: ConversionParameters) -> list:
+    aJobs = []
+    if os.path.isdir(theInput):
+        for aDirPath, aDirNames, aFileNames in os.walk(theInput):
+            aDirNames.sort()
+            for aFileName in sorted(aFileNames):
+                if aFileName.startswith("."):
+                    continue
+                aSource = os.path.join(aDirPath, aFileName)
+                aRelPath = os.path.relpath(aSource, theInput)
+                aDest = os.path.join(theOutputDir, os.path.splitext(aRelPath)[0] + "." + theFormat)
+                aJobs.append(ConversionJob(aSource, aDest, theParams))
+    else:
+        aManifestDir = os.path.dirname(theInput)
+        with open(theInput, "r") as aManifest:
+            for aLine in aManifest:
+                aLine = aLine.strip()
+                if not aLine or aLine.startswith("#"):
+                    continue
+                aFields = aLine.split("\t")
+                aSource = os.path.join(aManifestDir, aFields[0])
+                if len(aFields) > 1:
+                    aDest = os.path.join(theOutputDir, aFields[1])
+                else:
+                    aDest = os.path.join(theOutputDir, Path(aSource).stem + "." + theFormat)
+                aJobs.append(ConversionJob(os.path.abspath(aSource), os.path.abspath(aDest), theParams))
+    return aJobs
+
+# theLatencies are times from the batch start to the completion of every job
+def PrintSummary(theResults: list, theTotalTime: float, theLatencies: list):
+    aSucceeded = [r for r in theResults if r.myIsOK]
+    aWallTimes = [r.myWallTime for r in theResults]
+    aLatencies = sorted(theLatencies)
+
+    print()
+    print(f"Files:       {len(theResults)} ({len(aSucceeded)} succeeded, {len(theResults) - len(aSucceeded)} failed)")
+    print(f"Total time:  {theTotalTime:.2f} s")
+    print(f"Throughput:  {len(theResults) / theTotalTime:.2f} files/s")
+    print(f"Per file:    min {min(aWallTimes):.2f} s, mean {sum(aWallTimes) / len(aWallTimes):.2f} s, max {max(aWallTimes):.2f} s")
+    print(f"Latency:     mean {sum(aLatencies) / len(aLatencies):.2f} s, "
+          f"p95 {aLatencies[min(len(aLatencies) - 1, int(0.95 * len(aLatencies)))]:.2f} s")
+
+    aCacheHits = sum(1 for r in theResults if r.myIsCacheHit)
+    if aCacheHits:
+        print(f"Cache:       {aCacheHits} hits, {len(theResults) - aCacheHits} misses")
+
+    aDuplicates = sum(1 for r in theResults if r.myDuplicateOf)
+    if aDuplicates:
+        print(f"Duplicates:  {aDuplicates} files converted as copies of identical inputs")
+
+    aRetried = sum(1 for r in theResults if r.myAttemptCount > 1)
+    if aRetried:
+        print(f"Retried:     {aRetried} ({sum(1 for r in theResults if r.myAttemptCount > 1 and r.myIsOK)} succeeded)")
+
+def CreatePool(theWorkerCount: int, theCacheDir: str, theCacheMaxSize: int, theWatchdog: ConversionWatchdog):
+    if theWatchdog:
+        # Jobs run in separate child processes, pool threads only supervise them
+        return multiprocessing.pool.ThreadPool(theWorkerCount), theWatchdog.Convert
+
+    # Every worker activates the license once in its initializer and then converts many files
+    aPool = multiprocessing.Pool(theWorkerCount, initializer=ConversionWorker.Initialize,
+                                 initargs=(theCacheDir, theCacheMaxSize))
+    return aPool, ConversionWorker.Convert
+
+# If theWatchdog is given, every job runs supervised in its own child process.
+# Jobs are started in the order defined by theScheduler (in the order of collection by default).
+# Unless theIsKeepingDuplicates is set, byte-identical inputs are converted only once.
+def main(theInput: str, theOutputDir: str, theFormat: str = "jt", theWorkerCount: int = 0,
+         theParams: ConversionParameters = None, theCacheDir: str = "", theCacheMaxSize: int = 0,
+         theWatchdog: ConversionWatchdog = None, theScheduler: JobScheduler = None, theIsKeepingDuplicates: bool = False):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aJobs = CollectJobs(theInput, theOutputDir, theFormat, theParams)
+    if not aJobs:
+        print("No input files found in " + theInput)
+        return 1
+
+    aJobCount = len(aJobs)
+    aDuplicates = None
+    if not theIsKeepingDuplicates:
+        aDuplicates = DuplicateInputs(aJobs, theWorkerCount)
+        aJobs = aDuplicates.myUniqueJobs
+
+    aScheduler = theScheduler if theScheduler else JobScheduler()
+    aJobs = aScheduler.Order(aJobs)
+
+    aWorkerCount = min(theWorkerCount if theWorkerCount > 0 else os.cpu_count(), len(aJobs))
+    print(f"Converting {len(aJobs)} files with {aWorkerCount} worker processes...")
+    if aDuplicates and aDuplicates.DuplicateCount():
+        print(f"{aDuplicates.DuplicateCount()} files are duplicates of other files and will not be converted again")
+
+    aResults = []
+    aLatencies = []
+    aStartTime = time.perf_counter()
+
+    aPool, aConvert = CreatePool(aWorkerCount, theCacheDir, theCacheMaxSize, theWatchdog)
+    with aPool:
+        # Tasks are handed out to the workers one by one in the order of aJobs
+        for aConvertedResult in aPool.imap_unordered(aConvert, aJobs, chunksize=1):
+            aNewResults = [aConvertedResult]
+            if aDuplicates:
+                aNewResults += aDuplicates.Materialize(aConvertedResult)
+
+            for aResult in aNewResults:
+                aResults.append(aResult)
+                aLatencies.append(time.perf_counter() - aStartTime)
+                aStatus = "FAILED"
+                if aResult.myIsOK:
+                    aStatus = "CACHED" if aResult.myIsCacheHit else "OK"
+                    if aResult.myAttemptCount > 1:
+                        aStatus = "RETRIED"
+                    if aResult.myDuplicateOf:
+                        aStatus = "DUPLICATE"
+                print(f"[{len(aResults)}/{aJobCount}] {aStatus} {aResult.myWallTime:8.2f} s  {aResult.mySource}")
+                if aResult.myDuplicateOf:
+                    print("    same as " + aResult.myDuplicateOf)
+                if not aResult.myIsOK:
+                    print("    " + aResult.myMessage)
+
+    PrintSummary(aResults, time.perf_counter() - aStartTime, aLatencies)
+    aScheduler.Learn(aResults)
+
+    if theWatchdog and theWatchdog.myQuarantinePath and not all(r.myIsOK for r in aResults):
+        print("Quarantined files are listed in " + theWatchdog.myQuarantinePath)
+
+    print("Completed")
+    return 0 if all(r.myIsOK for r in aResults) else 1
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Converts a batch of files using a pool of worker processes.")
+    aParser.add_argument("input", help="directory with the files to be converted or a manifest file listing them")
+    aParser.add_argument("output_dir", help="directory to write the converted files to")
+    aParser.add_argument("--format", default="jt", help="extension of the target format (default: jt)")
+    aParser.add_argument("--workers", type=int, default=0, help="number of worker processes (default: number of CPUs)")
+    aParser.add_argument("--params", default="", help="JSON file with reader and writer parameters")
+    aParser.add_argument("--cache-dir", default="", help="directory of the conversion results cache (default: no cache)")
+    aParser.add_argument("--cache-size", type=int, default=10240, help="cache size limit in megabytes (default: 10240)")
+    aParser.add_argument("--timeout", type=float, default=0, help="supervise jobs and kill the ones running longer, in seconds")
+    aParser.add_argument("--memory-limit", type=int, default=0, help="supervise jobs and limit their address space, in megabytes")
+    aParser.add_argument("--schedule", choices=JobScheduler.myPolicies, default="fifo",
+                         help="order of jobs: as collected, shortest first or largest first (default: fifo)")
+    aParser.add_argument("--throughput-model", default="", help="JSON file with learned per-format throughputs, "
+                                                                "updated after every batch (default: built-in per-format priors)")
+    aParser.add_argument("--keep-duplicates", action="store_true", help="convert byte-identical input files separately")
+    aParser.add_argument("--fallback-params", default="", help="JSON file with parameters for retrying failed supervised jobs "
+                                                               "(default: STEP advanced B-Rep)")
+    anArgs = aParser.parse_args()
+
+    aParams = ConversionParameters.FromFile(anArgs.params) if anArgs.params else ConversionParameters()
+    aCacheDir = os.path.abspath(anArgs.cache_dir) if anArgs.cache_dir else ""
+    anOutputDir = os.path.abspath(anArgs.output_dir)
+
+    aWatchdog = None
+    if anArgs.timeout > 0 or anArgs.memory_limit > 0:
+        aFallbackParams = ConversionParameters.FromFile(anArgs.fallback_params) if anArgs.fallback_params else None
+        aWatchdog = ConversionWatchdog(anArgs.timeout, anArgs.memory_limit * 1024 * 1024, aFallbackParams,
+                                       os.path.join(anOutputDir, "quarantine.jsonl"), aCacheDir, anArgs.cache_size * 1024 * 1024)
+
+    aModelPath = os.path.abspath(anArgs.throughput_model) if anArgs.throughput_model else ""
+    aScheduler = JobScheduler(anArgs.schedule, aModelPath)
+
+    sys.exit(main(os.path.abspath(anArgs.input), anOutputDir, anArgs.format, anArgs.workers,
+                  aParams, aCacheDir, anArgs.cache_size * 1024 * 1024, aWatchdog, aScheduler, anArgs.keep_duplicates))
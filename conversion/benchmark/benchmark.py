@@ -0,0 +1,250 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from conversion_parameters import ConversionParameters
+from format_registry import FormatRegistry
+from process_memory import PeakRSS, ResetPeakRSS
+from sdk_version import SDKVersion
+
+
+# Writer parameters of the benchmarked target formats, other targets are written with default parameters
+def TargetParameters(theTarget: str) -> ConversionParameters:
+    if theTarget == "cdxweb":
+        return ConversionParameters({"CadExCore.ModelData_WriterParameters": {
+            "FileFormat": "CDXWEB",
+            "WriteBRepRepresentation": True,
+            "WritePolyRepresentation": True,
+            "PreferredLOD": "ModelData_RM_MediumLOD",
+            "WriteTextures": False,
+            "WritePMI": False
+        }})
+    return ConversionParameters()
+
+def DirSize(theDir: str) -> int:
+    aSize = 0
+    for aDirPath, aDirNames, aFileNames in os.walk(theDir):
+        for aFileName in aFileNames:
+            aSize += os.path.getsize(os.path.join(aDirPath, aFileName))
+    return aSize
+
+# Peak memory of a phase is measured if the peak can be reset before the phase,
+# otherwise only the peak of the whole process is reported for the model
+def Measure(theFunc, *theArgs):
+    anIsPeakReset = ResetPeakRSS()
+    aWallStart = time.perf_counter()
+    aCPUStart = time.process_time()
+    aRes = theFunc(*theArgs)
+    aPhase = {"wall": time.perf_counter() - aWallStart, "cpu": time.process_time() - aCPUStart}
+    if anIsPeakReset:
+        aPhase["peakRSS"] = PeakRSS()
+    return aRes, aPhase
+
+# Runs in a separate process for every model, so that peak memory of one model doesn't affect another
+def BenchmarkModel(theSource: str, theOutputDir: str, theTargets: list) -> dict:
+    aRecord = {"model": os.path.basename(theSource), "inputSize": os.path.getsize(theSource), "phases": {}, "writes": {}}
+
+    if not cadex.LicenseManager.Activate(license.Value()):
+        aRecord["error"] = "Failed to activate CAD Exchanger license."
+        return aRecord
+
+    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+
+    aModel = cadex.ModelData_Model()
+    try:
+        aFormat = FormatRegistry.ByExtension(theSource)
+        aReader = aFormat.CreateReader() if aFormat else None
+        if aReader is not None:
+            anIsOK, aRecord["phases"]["read"] = Measure(aReader.ReadFile, cadex.Base_UTF16String(theSource))
+            if anIsOK:
+                anIsOK, aRecord["phases"]["transfer"] = Measure(aReader.Transfer, aModel)
+        else:
+            # Formats without a dedicated reader are read and transferred in one step
+            aModelReader = cadex.ModelData_ModelReader()
+            anIsOK, aRecord["phases"]["read"] = Measure(aModelReader.Read, cadex.Base_UTF16String(theSource), aModel)
+    except cadex.Base_Exception as anEx:
+        anIsOK = False
+        aRecord["error"] = str(anEx.What())
+
+    if not anIsOK:
+        aRecord.setdefault("error", "Failed to read the file " + theSource)
+        return aRecord
+
+    for aTarget in theTargets:
+        aTargetDir = os.path.join(theOutputDir, aRecord["model"], aTarget)
+        if aTarget == "cdxweb":
+            aDest = os.path.join(aTargetDir, aRecord["model"] + ".cdxweb", "scenegraph.cdxweb")
+        else:
+            aDest = os.path.join(aTargetDir, Path(theSource).stem + "." + aTarget)
+        os.makedirs(os.path.dirname(aDest), exist_ok=True)
+
+        aWriter = cadex.ModelData_ModelWriter()
+        TargetParameters(aTarget).ApplyTo(None, aWriter)
+        try:
+            anIsWritten, aWrite = Measure(aWriter.Write, aModel, cadex.Base_UTF16String(aDest))
+            aWrite["ok"] = bool(anIsWritten)
+        except cadex.Base_Exception as anEx:
+            aWrite = {"ok": False, "error": str(anEx.What())}
+        aWrite["outputSize"] = DirSize(aTargetDir)
+        aRecord["writes"][aTarget] = aWrite
+
+    aRecord["processPeakRSS"] = PeakRSS()
+    return aRecord
+
+# Runs BenchmarkModel() in a freshly started process. A process killed by a native crash is recorded as a failed model.
+def RunBenchmarkProcess(theSource: str, theOutputDir: str, theTargets: list) -> dict:
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as anExecutor:
+        try:
+            return anExecutor.submit(BenchmarkModel, theSource, theOutputDir, theTargets).result()
+        except BrokenProcessPool:
+            return {"model": os.path.basename(theSource), "inputSize": os.path.getsize(theSource), "phases": {}, "writes": {},
+                    "error": "Benchmark process terminated abruptly"}
+
+# Returns descriptions of all the metrics which got worse than in the baseline by more than theThreshold,
+# of the writes which failed while they succeeded in the baseline and of the models which failed
+def CompareWithBaseline(theBaseline: dict, theReport: dict, theThreshold: float) -> list:
+    # Small absolute changes are ignored as noise
+    aMinDeltas = {"wall": 0.05, "cpu": 0.05, "peakRSS": 16 * 1024 * 1024, "outputSize": 1024}
+
+    aRegressions = []
+    aBaselineModels = {aModel["model"]: aModel for aModel in theBaseline["models"]}
+    for aModel in theReport["models"]:
+        anOldModel = aBaselineModels.get(aModel["model"])
+        if anOldModel is None:
+            continue
+
+        aPairs = [(aName, anOldModel["phases"].get(aName), aPhase) for aName, aPhase in aModel["phases"].items()]
+        aPairs += [("write " + aTarget, anOldModel["writes"].get(aTarget), aWrite) for aTarget, aWrite in aModel["writes"].items()]
+        for aName, anOldPhase, aNewPhase in aPairs:
+            if not anOldPhase:
+                continue
+            if anOldPhase.get("ok", True) and not aNewPhase.get("ok", True):
+                aRegressions.append(f"{aModel['model']}: {aName} failed {aNewPhase.get('error', '')}".rstrip())
+                continue
+            for aMetric, aMinDelta in aMinDeltas.items():
+                if aMetric not in anOldPhase or aMetric not in aNewPhase:
+                    continue
+                anOldValue = anOldPhase[aMetric]
+                aNewValue = aNewPhase[aMetric]
+                if aNewValue - anOldValue > max(anOldValue * theThreshold, aMinDelta):
+                    aRegressions.append(f"{aModel['model']}: {aName} {aMetric} {anOldValue:.3f} -> {aNewValue:.3f}")
+
+        if "error" in aModel and "error" not in anOldModel:
+            aRegressions.append(f"{aModel['model']}: {aModel['error']}")
+    return aRegressions
+
+def PrintRecord(theRecord: dict):
+    print(theRecord["model"])
+    if "error" in theRecord:
+        print("    ERROR: " + theRecord["error"])
+    for aName, aPhase in theRecord["phases"].items():
+        print(f"    {aName:16} wall {aPhase['wall']:8.2f} s  cpu {aPhase['cpu']:8.2f} s")
+    for aTarget, aWrite in theRecord["writes"].items():
+        if aWrite["ok"]:
+            print(f"    {'write ' + aTarget:16} wall {aWrite['wall']:8.2f} s  cpu {aWrite['cpu']:8.2f} s  "
+                  f"size {aWrite['outputSize'] / 1024:10.1f} KB")
+        else:
+            print(f"    {'write ' + aTarget:16} FAILED {aWrite.get('error', '')}")
+    if "processPeakRSS" in theRecord:
+        print(f"    peak RSS {theRecord['processPeakRSS'] / (1024 * 1024):.1f} MB")
+
+def main(theModelsDir: str, theOutputDir: str, theTargets: list = None, theBaseline: str = "", theThreshold: float = 0.1):
+    aTargets = theTargets if theTargets else ["jt", "stp", "obj", "cdxweb"]
+
+    aModels = sorted(os.path.join(theModelsDir, aName) for aName in os.listdir(theModelsDir)
+                     if os.path.isfile(os.path.join(theModelsDir, aName)) and not aName.startswith("."))
+    if not aModels:
+        print("No models found in " + theModelsDir)
+        return 1
+
+    aReport = {
+        "sdkVersion": SDKVersion(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "models": []
+    }
+
+    # Every model is benchmarked in a freshly started process
+    for aSource in aModels:
+        aRecord = RunBenchmarkProcess(aSource, theOutputDir, aTargets)
+        aReport["models"].append(aRecord)
+        PrintRecord(aRecord)
+
+    os.makedirs(theOutputDir, exist_ok=True)
+    aReportPath = os.path.join(theOutputDir, "benchmark.json")
+    with open(aReportPath, "w") as aFile:
+        json.dump(aReport, aFile, indent=4)
+    print("Results are saved to " + aReportPath)
+
+    aRes = 0
+    if theBaseline:
+        with open(theBaseline, "r") as aFile:
+            aBaseline = json.load(aFile)
+        print(f"\nComparing with baseline {theBaseline} (SDK {aBaseline.get('sdkVersion', 'unknown')}):")
+        aRegressions = CompareWithBaseline(aBaseline, aReport, theThreshold)
+        for aRegression in aRegressions:
+            print("    REGRESSION " + aRegression)
+        if aRegressions:
+            aRes = 1
+        else:
+            print("    No regressions found")
+
+    print("Completed")
+    return aRes
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Measures reading, transfer and writing of every model in a directory.")
+    aParser.add_argument("models_dir", help="directory with the models to be benchmarked")
+    aParser.add_argument("output_dir", help="directory to write the converted files and benchmark.json to")
+    aParser.add_argument("--targets", default="jt,stp,obj,cdxweb", help="comma separated target formats (default: jt,stp,obj,cdxweb)")
+    aParser.add_argument("--baseline", default="", help="benchmark.json of a previous run to compare with")
+    aParser.add_argument("--threshold", type=float, default=0.1, help="relative change reported as a regression (default: 0.1)")
+    anArgs = aParser.parse_args()
+
+    sys.exit(main(os.path.abspath(anArgs.models_dir), os.path.abspath(anArgs.output_dir), anArgs.targets.split(","),
+                  os.path.abspath(anArgs.baseline) if anArgs.baseline else "", anArgs.threshold))
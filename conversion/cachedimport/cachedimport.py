@@ -0,0 +1,84 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from cdx_import_cache import CachedModelReader
+
+
+def main(theSource: str, theCacheDir: str = ""):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aReader = CachedModelReader(theCacheDir)
+
+    # The first import parses the original file and saves a .cdx copy of the model,
+    # the second one loads that copy
+    for i in range(2):
+        aModel = cadex.ModelData_Model()
+
+        aStartTime = time.perf_counter()
+        if not aReader.Read(theSource, aModel):
+            print("Failed to read the file " + theSource)
+            return 1
+
+        aSourceOfModel = "cached .cdx file" if aReader.myIsCacheHit else "original file"
+        print(f"Import {i + 1}: read {aSourceOfModel} in {time.perf_counter() - aStartTime:.2f} s")
+        print(f"Model name: {aModel.Name()}")
+        print(f"Number of roots: {aModel.NumberOfRoots()}")
+
+        # The .cdx copy is written in the background, it has to be complete before the next import
+        aReader.Wait()
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 and len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> [<cache_dir>], where:")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <cache_dir>   is a name of the directory to keep .cdx copies in (by default next to the input file)")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aCacheDir = os.path.abspath(sys.argv[2]) if len(sys.argv) == 3 else ""
+
+    sys.exit(main(aSource, aCacheDir))
@@ -0,0 +1,79 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionJob, ConversionWorker
+
+
+def main(theSource: str, theDest: str, theCacheDir: str):
+    if not ConversionWorker.Initialize(theCacheDir, 1024 * 1024 * 1024):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    # The same parameters as in the transferparams example. They are a part of the cache key,
+    # so changing any of them leads to a new conversion.
+    aParams = ConversionParameters({
+        "CadExSTEP.STEP_ReaderParameters": {"PreferredBRepRepresentationType": "AdvancedBRep"},
+        "CadExJT.JT_WriterParameters":     {"FileSplitMode": "PerPart"}
+    })
+
+    # The second conversion of the same file with the same parameters is served from the cache
+    # without reading and writing the model
+    for i in range(2):
+        aResult = ConversionWorker.Convert(ConversionJob(theSource, theDest, aParams))
+        if not aResult.myIsOK:
+            print(aResult.myMessage)
+            return 1
+
+        aSourceOfResult = "taken from cache" if aResult.myIsCacheHit else "converted"
+        print(f"Run {i + 1}: {aSourceOfResult} in {aResult.myWallTime:.2f} s")
+
+    ConversionWorker.myCache.PrintStatistics()
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <output_file> <cache_dir>, where:")
+        print("    <input_file>  is a name of the STEP file to be read")
+        print("    <output_file> is a name of the JT file to Save() the model")
+        print("    <cache_dir>   is a name of the directory to keep the conversion cache in")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDest = os.path.abspath(sys.argv[2])
+    aCacheDir = os.path.abspath(sys.argv[3])
+
+    sys.exit(main(aSource, aDest, aCacheDir))
@@ -0,0 +1,86 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from cdxweb_skip_cache import CDXWEBSkipCache
+
+
+def main(theSource: str, theDest: str):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aStartTime = time.perf_counter()
+
+    # Opening the file and saving the CDXWEB file, skipped if neither the file nor the parameters changed
+    # since the previous run. Otherwise the whole model is converted again, but only the changed files
+    # of the previously written bundle are replaced.
+    aWriter = CDXWEBSkipCache()
+
+    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+    try:
+        if not aWriter.Write(theSource, theDest):
+            print("Failed to convert the file " + theSource + " to the .cdxweb file " + theDest)
+            return 1
+    except cadex.Base_Exception as anEx:
+        print(anEx.What())
+        return 1
+
+    if aWriter.myIsSkipped:
+        print("The source has not changed, the bundle is up to date")
+    else:
+        print(f"Updated files: {aWriter.myUpdatedFiles}")
+    print(f"Conversion time: {time.perf_counter() - aStartTime:.2f} s")
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <output_file>, where:")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the CDXWEB file to update")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDest = os.path.abspath(sys.argv[2])
+
+    sys.exit(main(aSource, aDest))
@@ -37,8 +37,11 @@ import os
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
 import cadex_license as license
 
+from stage_profiler import StageProfiler
+
 
 def main(theSource: str, theDest: str):
     aKey = license.Value()
@@ -51,35 +54,47 @@ def main(theSource: str, theDest: str):
 
     aModel = cadex.ModelData_Model()
 
-    # Opening and converting the file
-    if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
-        print("Failed to read the file " + theSource)
-        return 1
-
-    # Now we can get some model data
-    print(f"Model name: {aModel.Name()}")
-    print(f"Number of roots: {aModel.NumberOfRoots()}")
-
-    # Saving the CDXWEB file
-    aWriter = cadex.ModelData_ModelWriter()
-    aParams = cadex.ModelData_WriterParameters()
-    aParams.SetFileFormat(cadex.ModelData_WriterParameters.CDXWEB)
-    aParams.SetWriteBRepRepresentation(True)
-    aParams.SetWritePolyRepresentation(True)
-    aParams.SetPreferredLOD(cadex.ModelData_RM_MediumLOD)
-    aParams.SetWriteTextures(False)
-    aParams.SetWritePMI(False)
+    # Records time and memory of every stage if CADEX_PROFILE environment variable is set
+    aProfiler = StageProfiler(theDest)
 
-    aWriter.SetWriterParameters(aParams)
-
-    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+    anIsOK = False
     try:
-        if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
-            print("Failed to save the .cdxweb file ", theDest)
+        # Opening and converting the file
+        with aProfiler.Stage("read"):
+            if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+                print("Failed to read the file " + theSource)
+                return 1
+
+        # Now we can get some model data
+        print(f"Model name: {aModel.Name()}")
+        print(f"Number of roots: {aModel.NumberOfRoots()}")
+
+        # Saving the CDXWEB file
+        aWriter = cadex.ModelData_ModelWriter()
+        aParams = cadex.ModelData_WriterParameters()
+        aParams.SetFileFormat(cadex.ModelData_WriterParameters.CDXWEB)
+        aParams.SetWriteBRepRepresentation(True)
+        aParams.SetWritePolyRepresentation(True)
+        aParams.SetPreferredLOD(cadex.ModelData_RM_MediumLOD)
+        aParams.SetWriteTextures(False)
+        aParams.SetWritePMI(False)
+
+        aWriter.SetWriterParameters(aParams)
+
+        cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        try:
+            with aProfiler.Stage("write"):
+                if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
+                    print("Failed to save the .cdxweb file ", theDest)
+                    return 1
+        except cadex.Base_Exception as anEx:
+            print(anEx.What())
             return 1
-    except cadex.Base_Exception as anEx:
-        print(anEx.What())
-        return 1
+
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
 
     print("Completed")
     return 0
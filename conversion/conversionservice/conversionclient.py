@@ -0,0 +1,73 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import json
+import time
+
+from urllib.request import Request, urlopen
+
+
+# Submits a conversion to the running conversion service. The client doesn't import CadEx modules
+# and doesn't activate the license, this is done once by the service workers.
+def Convert(theSource: str, theDest: str, theParams: dict = None, thePort: int = 8765) -> dict:
+    aBody = json.dumps({"source": theSource, "target": theDest, "params": theParams if theParams else {}})
+    aRequest = Request(f"http://127.0.0.1:{thePort}/convert", data=aBody.encode(),
+                       headers={"Content-Type": "application/json"})
+    with urlopen(aRequest) as aResponse:
+        return json.loads(aResponse.read())
+
+def main(theSource: str, theDest: str, thePort: int = 8765):
+    aStartTime = time.perf_counter()
+    aResult = Convert(theSource, theDest, None, thePort)
+    if not aResult["ok"]:
+        print(aResult["message"])
+        return 1
+
+    print(f"Converted by worker {aResult['worker']} in {aResult['time']:.2f} s "
+          f"(request took {time.perf_counter() - aStartTime:.2f} s)")
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 and len(sys.argv) != 4:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <output_file> [<port>], where:")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the file to Save() the model")
+        print("    <port>        is a port the conversion service listens on (8765 by default)")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDest = os.path.abspath(sys.argv[2])
+    aPort = int(sys.argv[3]) if len(sys.argv) == 4 else 8765
+
+    sys.exit(main(aSource, aDest, aPort))
@@ -0,0 +1,178 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import json
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionJob, ConversionWorker
+
+
+# Resident conversion service listening on a local HTTP port.
+# Requests are converted by a pool of worker processes which are started, have the CadEx modules
+# imported and the license activated once at the service startup, so a request only costs the
+# conversion itself. Requests:
+#     POST /convert  {"source": "<path>", "target": "<path>", "params": {<ConversionParameters spec>}}
+#     GET  /status
+# A worker killed by a native crash breaks the whole pool, so the request it was converting (and the ones
+# running in the other workers at that moment) fail with status 500 and a new pool is started and warmed up.
+class ConversionServer(ThreadingHTTPServer):
+    def __init__(self, thePort: int, theWorkerCount: int):
+        super().__init__(("127.0.0.1", thePort), ConversionRequestHandler)
+        self.myWorkerCount = theWorkerCount
+        self.myExecutor = None
+        self.myLock = threading.Lock()
+        self.myPoolLock = threading.Lock()
+        self.myCompleted = 0
+        self.myFailed = 0
+        self.myRestarts = 0
+
+    # Starts the worker pool and makes it start all its processes before the first request comes.
+    # Returns False if the license could not be activated in the workers.
+    def StartPool(self) -> bool:
+        anExecutor = ProcessPoolExecutor(self.myWorkerCount, initializer=ConversionWorker.Initialize)
+        aWarmUps = [anExecutor.submit(ConversionWorker.Initialize) for i in range(self.myWorkerCount)]
+        wait(aWarmUps)
+        self.myExecutor = anExecutor
+        return all(not aWarmUp.exception() and aWarmUp.result() for aWarmUp in aWarmUps)
+
+    def StopPool(self):
+        if self.myExecutor:
+            self.myExecutor.shutdown()
+            self.myExecutor = None
+
+    # Returns None if the worker process crashed
+    def Convert(self, theJob: ConversionJob):
+        # Waits for the pool being restarted
+        with self.myPoolLock:
+            anExecutor = self.myExecutor
+        try:
+            aResult = anExecutor.submit(ConversionWorker.Convert, theJob).result()
+        except BrokenProcessPool:
+            self.__RestartPool(anExecutor)
+            with self.myLock:
+                self.myFailed += 1
+            return None
+
+        with self.myLock:
+            if aResult.myIsOK:
+                self.myCompleted += 1
+            else:
+                self.myFailed += 1
+        return aResult
+
+    # All the requests running in the broken pool get here, only the first one restarts it
+    def __RestartPool(self, theBrokenExecutor: ProcessPoolExecutor):
+        with self.myPoolLock:
+            if self.myExecutor is not theBrokenExecutor:
+                return
+            theBrokenExecutor.shutdown(wait=False)
+            if not self.StartPool():
+                print("Failed to activate CAD Exchanger license in the restarted workers.")
+            with self.myLock:
+                self.myRestarts += 1
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/convert":
+            self.__Reply(404, {"error": "Unknown request " + self.path})
+            return
+
+        try:
+            aRequest = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            aJob = ConversionJob(os.path.abspath(aRequest["source"]), os.path.abspath(aRequest["target"]),
+                                 ConversionParameters(aRequest.get("params")))
+        except (ValueError, KeyError, TypeError) as anEx:
+            self.__Reply(400, {"error": "Invalid request: " + str(anEx)})
+            return
+
+        aResult = self.server.Convert(aJob)
+        if aResult is None:
+            self.__Reply(500, {"error": "Worker process terminated abruptly, the workers are restarted"})
+            return
+
+        self.__Reply(200, {"ok": aResult.myIsOK, "message": aResult.myMessage,
+                           "time": aResult.myWallTime, "worker": aResult.myWorkerId})
+
+    def do_GET(self):
+        if self.path != "/status":
+            self.__Reply(404, {"error": "Unknown request " + self.path})
+            return
+
+        with self.server.myLock:
+            self.__Reply(200, {"completed": self.server.myCompleted, "failed": self.server.myFailed,
+                               "restarts": self.server.myRestarts})
+
+    def __Reply(self, theCode: int, theBody: dict):
+        aData = json.dumps(theBody).encode()
+        self.send_response(theCode)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(aData)))
+        self.end_headers()
+        self.wfile.write(aData)
+
+def main(thePort: int = 8765, theWorkerCount: int = 0):
+    aWorkerCount = theWorkerCount if theWorkerCount > 0 else os.cpu_count()
+
+    with ConversionServer(thePort, aWorkerCount) as aServer:
+        if not aServer.StartPool():
+            aServer.StopPool()
+            print("Failed to activate CAD Exchanger license.")
+            return 1
+
+        print(f"Conversion service with {aWorkerCount} workers is listening on http://127.0.0.1:{thePort}")
+        try:
+            aServer.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            aServer.StopPool()
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " [<port> [<workers>]], where:")
+        print("    <port>    is a local port to listen on (8765 by default)")
+        print("    <workers> is a number of worker processes (number of CPUs by default)")
+        sys.exit(1)
+
+    aPort = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    aWorkerCount = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    sys.exit(main(aPort, aWorkerCount))
@@ -36,8 +36,11 @@ import cadexchanger.CadExCore as cadex
 import cadexchanger.CadExOBJ as obj
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
 import cadex_license as license
 
+from stage_profiler import StageProfiler
+
 
 def main(theSource: str, theDest: str):
     aKey = license.Value()
@@ -48,31 +51,44 @@ def main(theSource: str, theDest: str):
 
     aModel = cadex.ModelData_Model()
 
-    if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
-        print("Failed to read the file " + theSource)
-        return 1
-
-    aWriter = obj.OBJ_Writer()
-    aWriterParams: obj.OBJ_WriterParameters = aWriter.Parameters()
+    # Records time and memory of every stage if CADEX_PROFILE environment variable is set
+    aProfiler = StageProfiler(theDest)
 
-    # Set some writer parameteres
-    aWriterParams.SetLengthUnit(cadex.Base_LU_Centimeters)
-    aWriterParams.SetToGenerateMtlFile(True)
-
-    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+    anIsOK = False
     try:
-        # Converting model data to a new format
-        if not aWriter.Transfer(aModel):
-            print("Failed to transfer model data to specified format")
+        with aProfiler.Stage("read"):
+            if not cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(theSource), aModel):
+                print("Failed to read the file " + theSource)
+                return 1
+
+        aWriter = obj.OBJ_Writer()
+        aWriterParams: obj.OBJ_WriterParameters = aWriter.Parameters()
+
+        # Set some writer parameteres
+        aWriterParams.SetLengthUnit(cadex.Base_LU_Centimeters)
+        aWriterParams.SetToGenerateMtlFile(True)
+
+        cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        try:
+            # Converting model data to a new format
+            with aProfiler.Stage("transfer"):
+                if not aWriter.Transfer(aModel):
+                    print("Failed to transfer model data to specified format")
+                    return 1
+
+            # Writing model data to file
+            with aProfiler.Stage("write"):
+                if not aWriter.WriteFile(cadex.Base_UTF16String(theDest)):
+                    print("Failed to write the file")
+                    return 1
+        except cadex.Base_Exception as anEx:
+            print(anEx.What())
             return 1
 
-        # Writing model data to file
-        if not aWriter.WriteFile(cadex.Base_UTF16String(theDest)):
-            print("Failed to write the file")
-            return 1
-    except cadex.Base_Exception as anEx:
-        print(anEx.What())
-        return 1
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
 
     print("Completed")
     return 0
@@ -0,0 +1,206 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import re
+import time
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionJob, ConversionResult, ConversionWorker
+from process_memory import CurrentRSS, PeakRSS
+from structure_import import ReadStructure
+
+
+# A part or an assembly written to its own file, along with all its placements in the product
+class AssemblyUnit:
+    def __init__(self, theIndex: int, theName: str, theType: str):
+        self.myIndex = theIndex
+        self.myName = theName
+        self.myType = theType
+        self.myTransformations = []
+
+# Splits the product into units: parts and assemblies located at theLevel levels of instances below the roots
+# (and parts located above that level). A negative level splits the product into parts only. A unit is identified by the number of the scene graph elements visited
+# before it, which is the same for every read of the same file, so a separate process can find the unit again.
+# Elements shared by several instances make one unit with several transformations.
+class AssemblyUnitCollector(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self, theLevel: int):
+        super().__init__()
+        self.myLevel = theLevel
+        self.myUnits = []
+        self.myElements = {}
+        self.myElementsByIndex = {}
+        self.myIndex = 0
+        self.myTransformationMatrix = [cadex.ModelData_Transformation()]
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        self.__AddUnit(thePart, "Part")
+        self.myIndex += 1
+
+    def VisitEnterAssembly(self, theAssembly: cadex.ModelData_Assembly) -> bool:
+        if self.myLevel < 0 or len(self.myTransformationMatrix) - 1 < self.myLevel:
+            self.myIndex += 1
+            return True
+        self.__AddUnit(theAssembly, "Assembly")
+        self.myIndex += 1
+        return False
+
+    def VisitEnterInstance(self, theInstance: cadex.ModelData_Instance) -> bool:
+        aTrsf = cadex.ModelData_Transformation()
+        if theInstance.HasTransformation():
+            aTrsf = theInstance.Transformation()
+        self.myTransformationMatrix.append(self.myTransformationMatrix[-1].Multiplied(aTrsf))
+        return True
+
+    def VisitLeaveInstance(self, theInstance: cadex.ModelData_Instance):
+        self.myTransformationMatrix.pop()
+
+    # Returns the scene graph element of the unit with theIndex
+    def Element(self, theIndex: int) -> cadex.ModelData_SceneGraphElement:
+        return self.myElementsByIndex.get(theIndex)
+
+    def __AddUnit(self, theSGE: cadex.ModelData_SceneGraphElement, theType: str):
+        aUnit = self.myElements.get(theSGE)
+        if aUnit is None:
+            aUnit = AssemblyUnit(self.myIndex, str(theSGE.Name()), theType)
+            self.myElements[theSGE] = aUnit
+            self.myElementsByIndex[self.myIndex] = theSGE
+            self.myUnits.append(aUnit)
+
+        aTrsf = self.myTransformationMatrix[-1]
+        aTranslation = aTrsf.TranslationPart()
+        aUnit.myTransformations.append({"rotation": list(aTrsf.RotationPart()),
+                                        "translation": [aTranslation.X(), aTranslation.Y(), aTranslation.Z()]})
+
+def UnitFileName(theUnit: AssemblyUnit, theFormat: str) -> str:
+    aName = re.sub(r"[^\w.-]", "_", theUnit.myName) if theUnit.myName else theUnit.myType.lower()
+    return f"{theUnit.myIndex:05d}_{aName}.{theFormat}"
+
+# The manifest lists the written files and the placements of their contents in the product.
+# It stands for the top-level assembly, which would otherwise need the whole product in memory.
+def WriteManifest(theSource: str, theOutputDir: str, theUnits: list, theFormat: str) -> str:
+    aManifest = {"source": theSource, "format": theFormat, "units": []}
+    for aUnit in theUnits:
+        aManifest["units"].append({"file": UnitFileName(aUnit, theFormat),
+                                   "name": aUnit.myName,
+                                   "type": aUnit.myType,
+                                   "transformations": aUnit.myTransformations})
+
+    aManifestPath = os.path.join(theOutputDir, Path(theSource).stem + ".json")
+    with open(aManifestPath, "w") as aFile:
+        json.dump(aManifest, aFile, indent=2)
+    return aManifestPath
+
+class AssemblyUnitJob(ConversionJob):
+    def __init__(self, theSource: str, theDest: str, theParams: ConversionParameters, theLevel: int, theIndex: int):
+        super().__init__(theSource, theDest, theParams)
+        self.myLevel = theLevel
+        self.myIndex = theIndex
+
+class AssemblyUnitResult(ConversionResult):
+    def __init__(self, theJob: AssemblyUnitJob):
+        super().__init__(theJob)
+        self.myIndex = theJob.myIndex
+        self.myPeakRSS = 0
+
+# Writes a single unit inside a pool worker process. The worker reads the scene graph only
+# (with delayed conversion), so the geometry of just this unit is converted when it is written.
+# By default the model is released after every unit, so the peak memory usage of a worker is bounded by
+# the scene graph and the largest unit. If a memory limit is given, the scene graph is kept for the next jobs
+# of the same worker (so the file is read once), together with the geometry converted for the written units,
+# until the worker exceeds the limit. The model is released then and is read again by the next job.
+class AssemblyUnitWriter:
+    myKey = None
+    myModel = None
+    myCollector = None
+    myMemoryLimit = 0
+
+    # Pool worker initializer, theMemoryLimit is in bytes (0 means the model is released after every unit)
+    @staticmethod
+    def Initialize(theMemoryLimit: int = 0) -> bool:
+        AssemblyUnitWriter.myMemoryLimit = theMemoryLimit
+        return ConversionWorker.Initialize()
+
+    @staticmethod
+    def Write(theJob: AssemblyUnitJob) -> AssemblyUnitResult:
+        aResult = AssemblyUnitResult(theJob)
+        aStartTime = time.perf_counter()
+        if not ConversionWorker.Initialize():
+            aResult.myMessage = "Failed to activate CAD Exchanger license."
+        else:
+            try:
+                aResult.myIsOK, aResult.myMessage = AssemblyUnitWriter.__DoWrite(theJob)
+            except cadex.Base_Exception as anEx:
+                aResult.myMessage = str(anEx.What())
+            except Exception as anEx:
+                aResult.myMessage = "Unhandled exception caught: " + str(anEx)
+        aResult.myWallTime = time.perf_counter() - aStartTime
+        aResult.myPeakRSS = PeakRSS()
+
+        if AssemblyUnitWriter.myMemoryLimit <= 0 or CurrentRSS() > AssemblyUnitWriter.myMemoryLimit:
+            AssemblyUnitWriter.myKey = None
+            AssemblyUnitWriter.myModel = None
+            AssemblyUnitWriter.myCollector = None
+        return aResult
+
+    @staticmethod
+    def __DoWrite(theJob: AssemblyUnitJob):
+        aKey = (theJob.mySource, theJob.myLevel)
+        if AssemblyUnitWriter.myKey != aKey:
+            AssemblyUnitWriter.myKey = None
+            AssemblyUnitWriter.myModel = cadex.ModelData_Model()
+            if not ReadStructure(theJob.mySource, AssemblyUnitWriter.myModel):
+                return False, "Failed to open the file " + theJob.mySource
+
+            AssemblyUnitWriter.myCollector = AssemblyUnitCollector(theJob.myLevel)
+            AssemblyUnitWriter.myModel.AcceptElementVisitor(AssemblyUnitWriter.myCollector)
+            AssemblyUnitWriter.myKey = aKey
+
+        anElement = AssemblyUnitWriter.myCollector.Element(theJob.myIndex)
+        if anElement is None:
+            return False, f"Unit {theJob.myIndex} is not found in the file " + theJob.mySource
+
+        # The unit is placed at the origin, its placements in the product are kept in the manifest
+        aUnitModel = cadex.ModelData_Model()
+        aUnitModel.AddRoot(anElement)
+
+        aWriter = cadex.ModelData_ModelWriter()
+        theJob.myParams.ApplyTo(None, aWriter)
+
+        os.makedirs(os.path.dirname(theJob.myDest), exist_ok=True)
+
+        if not aWriter.Write(aUnitModel, cadex.Base_UTF16String(theJob.myDest)):
+            return False, "Failed to convert and write the file to specified format " + theJob.myDest
+
+        return True, ""
@@ -0,0 +1,100 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cadexchanger.CadExCore as cadex
+
+from conversion_parameters import ConversionParameters
+
+
+class ConversionCanceledError(Exception):
+    pass
+
+# asyncio front-end for conversions.
+# Reading and writing run in a thread pool, so the event loop is never blocked, and at most
+# theMaxInFlight conversions run at a time: other callers wait in Convert() for a free slot.
+# Cancelling the awaiting coroutine cancels the underlying job through its Base_ProgressStatus,
+# so the reader or the writer stops at its next progress check instead of finishing the work.
+class AsyncConverter:
+    def __init__(self, theMaxInFlight: int = 0):
+        self.myMaxInFlight = theMaxInFlight if theMaxInFlight > 0 else os.cpu_count()
+        self.myExecutor = ThreadPoolExecutor(self.myMaxInFlight)
+        self.mySemaphore = None
+
+    async def Convert(self, theSource: str, theDest: str, theParams: ConversionParameters = None):
+        if self.mySemaphore is None:
+            self.mySemaphore = asyncio.Semaphore(self.myMaxInFlight)
+
+        aParams = theParams if theParams else ConversionParameters()
+        async with self.mySemaphore:
+            aStatus = cadex.Base_ProgressStatus()
+            aLoop = asyncio.get_running_loop()
+            aFuture = aLoop.run_in_executor(self.myExecutor, AsyncConverter.__DoConvert,
+                                            theSource, theDest, aParams, aStatus)
+            try:
+                await asyncio.shield(aFuture)
+            except asyncio.CancelledError:
+                aStatus.Cancel()
+                # Keep the in-flight slot until the job has actually stopped
+                try:
+                    await aFuture
+                except Exception:
+                    pass
+                raise
+
+    def Shutdown(self):
+        self.myExecutor.shutdown(wait=True)
+
+    @staticmethod
+    def __DoConvert(theSource: str, theDest: str, theParams: ConversionParameters, theStatus: cadex.Base_ProgressStatus):
+        aModel = cadex.ModelData_Model()
+
+        aReader = cadex.ModelData_ModelReader()
+        aWriter = cadex.ModelData_ModelWriter()
+        theParams.ApplyTo(aReader, aWriter)
+        aReader.SetProgressStatus(theStatus)
+        aWriter.SetProgressStatus(theStatus)
+
+        anIsOK = aReader.Read(cadex.Base_UTF16String(theSource), aModel)
+        if theStatus.WasCanceled():
+            raise ConversionCanceledError("Conversion of " + theSource + " was canceled")
+        if not anIsOK:
+            raise RuntimeError("Failed to open and convert the file " + theSource)
+
+        os.makedirs(os.path.dirname(theDest), exist_ok=True)
+
+        anIsOK = aWriter.Write(aModel, cadex.Base_UTF16String(theDest))
+        if theStatus.WasCanceled():
+            raise ConversionCanceledError("Conversion of " + theSource + " was canceled")
+        if not anIsOK:
+            raise RuntimeError("Failed to convert and write the file to specified format " + theDest)
@@ -0,0 +1,181 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import multiprocessing
+import os
+import uuid
+
+import cadexchanger.CadExCore as cadex
+
+from conversion_cache import ConversionCache
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionWorker
+
+
+# Reader that keeps a native .cdx copy of every imported file and loads it instead of parsing the
+# original file next time, as reading .cdx is much faster than reading e.g. STEP or JT.
+# The .cdx file is kept next to the source (<source>.cdx) or in the given cache directory together with
+# a small JSON file with the source path, size, modification time, content hash and reader parameters. The cached copy is
+# used if size and modification time match, or if the size and the content hash match (e.g. for a
+# copied or touched file). On a miss the source is parsed and Read() returns, while the .cdx file is written
+# in the background by a separate process which parses the source once more. So the caller does not wait for
+# the .cdx file and may modify the model meanwhile. Call Wait() to make sure the .cdx files are written
+# (e.g. before reading the same file again); pending writers are also waited for at the interpreter exit.
+# As the writer processes are spawned, scripts using this reader need the if __name__ == "__main__" guard.
+class CachedModelReader:
+    def __init__(self, theCacheDir: str = ""):
+        self.myCacheDir = theCacheDir
+        self.myIsCacheHit = False
+        self.myWriters = {}
+
+    def Read(self, theSource: str, theModel: cadex.ModelData_Model, theParams: ConversionParameters = None) -> bool:
+        aParams = theParams if theParams else ConversionParameters()
+        aCdxPath, anInfoPath = self.__CachePaths(theSource)
+        self.myIsCacheHit = False
+
+        aSourceInfo = CachedModelReader.__SourceInfo(theSource, aParams)
+        if aSourceInfo is None:
+            return False
+
+        if CachedModelReader.__IsUpToDate(anInfoPath, aSourceInfo, theSource) and os.path.isfile(aCdxPath):
+            if cadex.ModelData_ModelReader().Read(cadex.Base_UTF16String(aCdxPath), theModel):
+                self.myIsCacheHit = True
+                return True
+
+        aReader = cadex.ModelData_ModelReader()
+        aParams.ApplyTo(aReader, None)
+        if not aReader.Read(cadex.Base_UTF16String(theSource), theModel):
+            return False
+
+        aWriter = self.myWriters.get(aCdxPath)
+        if aWriter is None or not aWriter.is_alive():
+            aWriter = multiprocessing.get_context("spawn").Process(
+                target=CachedModelReader.WriteCache, args=(theSource, aParams, aSourceInfo, aCdxPath, anInfoPath))
+            aWriter.start()
+            self.myWriters[aCdxPath] = aWriter
+        return True
+
+    # Waits until the .cdx copies of all the files read so far are written
+    def Wait(self):
+        for aWriter in self.myWriters.values():
+            aWriter.join()
+        self.myWriters = {}
+
+    # Runs in a separate process, parses the source and writes its .cdx copy
+    @staticmethod
+    def WriteCache(theSource: str, theParams: ConversionParameters, theSourceInfo: dict,
+                   theCdxPath: str, theInfoPath: str):
+        if not ConversionWorker.Initialize():
+            return
+
+        aModel = cadex.ModelData_Model()
+        aReader = cadex.ModelData_ModelReader()
+        theParams.ApplyTo(aReader, None)
+        try:
+            if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+                return
+            CachedModelReader.__Store(aModel, theSource, theSourceInfo, theCdxPath, theInfoPath)
+        except (cadex.Base_Exception, OSError):
+            # The model is read by the caller anyway, it just won't be cached (e.g. in a read-only directory)
+            pass
+
+    def __CachePaths(self, theSource: str):
+        if self.myCacheDir:
+            aName = hashlib.sha256(os.path.abspath(theSource).encode()).hexdigest()
+            aBase = os.path.join(self.myCacheDir, aName)
+        else:
+            aBase = theSource
+        return aBase + ".cdx", aBase + ".cdx.json"
+
+    # Returns None if the source is missing
+    @staticmethod
+    def __SourceInfo(theSource: str, theParams: ConversionParameters) -> dict:
+        try:
+            aStat = os.stat(theSource)
+        except OSError:
+            return None
+        return {"path": os.path.abspath(theSource), "size": aStat.st_size, "mtime": aStat.st_mtime_ns,
+                "params": theParams.CanonicalString()}
+
+    @staticmethod
+    def __IsUpToDate(theInfoPath: str, theSourceInfo: dict, theSource: str) -> bool:
+        try:
+            with open(theInfoPath, "r") as aFile:
+                aCachedInfo = json.load(aFile)
+            for aKey in ("path", "size", "params"):
+                if aCachedInfo[aKey] != theSourceInfo[aKey]:
+                    return False
+            if aCachedInfo["mtime"] == theSourceInfo["mtime"]:
+                return True
+            if aCachedInfo["hash"] != ConversionCache.HashFile(theSource).hexdigest():
+                return False
+        except (OSError, ValueError, KeyError, TypeError):
+            # A missing or malformed info file is a cache miss
+            return False
+
+        # The content is the same, so remember the new modification time to avoid hashing the source next time
+        anInfo = dict(aCachedInfo)
+        anInfo["mtime"] = theSourceInfo["mtime"]
+        try:
+            CachedModelReader.__WriteInfo(anInfo, theInfoPath)
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def __WriteInfo(theInfo: dict, theInfoPath: str):
+        aTmpInfoPath = theInfoPath + f".{uuid.uuid4().hex}.tmp"
+        with open(aTmpInfoPath, "w") as aFile:
+            json.dump(theInfo, aFile)
+        os.replace(aTmpInfoPath, theInfoPath)
+
+    @staticmethod
+    def __Store(theModel: cadex.ModelData_Model, theSource: str, theSourceInfo: dict,
+                     theCdxPath: str, theInfoPath: str):
+        aDir = os.path.dirname(theCdxPath)
+        if aDir:
+            os.makedirs(aDir, exist_ok=True)
+
+        # Write to temporary files first, so that an interrupted write never leaves a broken cache
+        aTmpCdxPath = theCdxPath + f".{uuid.uuid4().hex}.tmp.cdx"
+        try:
+            anIsWritten = cadex.ModelData_ModelWriter().Write(theModel, cadex.Base_UTF16String(aTmpCdxPath))
+        except cadex.Base_Exception:
+            anIsWritten = False
+        if not anIsWritten:
+            if os.path.exists(aTmpCdxPath):
+                os.remove(aTmpCdxPath)
+            return
+
+        anInfo = dict(theSourceInfo)
+        anInfo["hash"] = ConversionCache.HashFile(theSource).hexdigest()
+        os.replace(aTmpCdxPath, theCdxPath)
+        CachedModelReader.__WriteInfo(anInfo, theInfoPath)
@@ -0,0 +1,160 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import shutil
+
+import cadexchanger.CadExCore as cadex
+
+from conversion_cache import ConversionCache
+from conversion_parameters import ConversionParameters
+from sdk_version import SDKVersion
+
+
+# A whole-file skip cache for CDXWEB export: converts a file to a CDXWEB bundle (the scene graph file and
+# the payload files next to it) unless the same file was already converted to it with the same parameters.
+# A manifest is kept in the bundle directory ("<scene graph file>.manifest.json"). It holds a fingerprint
+# of all the export inputs: the content hash of the source file, the reader and writer parameters and the
+# SDK version. So appearances, materials, properties, PMI and any other data of the source are covered
+# without walking the model. If the fingerprint did not change and the bundle files are in place,
+# the source is neither read nor written again.
+# This is not a per-part incremental export: the CDXWEB writer can not write a subset of the part payloads,
+# so any change of the inputs re-reads and re-exports the whole model. It is written to a staging directory
+# and only the bundle files whose content changed are replaced, so unchanged payloads keep their modification
+# times (e.g. for upload or CDN caches).
+# Only the source file itself is hashed, files it references (e.g. parts of a shattered JT assembly)
+# are not tracked.
+class CDXWEBSkipCache:
+    def __init__(self, theParams: ConversionParameters = None):
+        self.myParams = theParams if theParams else CDXWEBSkipCache.DefaultParameters()
+        self.myUpdatedFiles = 0
+        self.myIsSkipped = False
+
+    # The same parameters as in the cdxwebconverter example
+    @staticmethod
+    def DefaultParameters() -> ConversionParameters:
+        return ConversionParameters({"CadExCore.ModelData_WriterParameters": {
+            "FileFormat": "CDXWEB",
+            "WriteBRepRepresentation": True,
+            "WritePolyRepresentation": True,
+            "PreferredLOD": "ModelData_RM_MediumLOD",
+            "WriteTextures": False,
+            "WritePMI": False}})
+
+    def Write(self, theSource: str, theDest: str) -> bool:
+        aManifestPath = theDest + ".manifest.json"
+        anOldManifest = CDXWEBSkipCache.__ReadManifest(aManifestPath)
+        anOldFiles = anOldManifest.get("files", [])
+
+        aFingerprint = self.__Fingerprint(theSource)
+        aBundleDir = os.path.dirname(theDest)
+        self.myUpdatedFiles = 0
+        self.myIsSkipped = (anOldManifest.get("fingerprint") == aFingerprint and os.path.isfile(theDest)
+                            and all(os.path.isfile(os.path.join(aBundleDir, aFile)) for aFile in anOldFiles))
+        if self.myIsSkipped:
+            return True
+
+        aReader = cadex.ModelData_ModelReader()
+        aWriter = cadex.ModelData_ModelWriter()
+        self.myParams.ApplyTo(aReader, aWriter)
+
+        aModel = cadex.ModelData_Model()
+        if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+            return False
+
+        aStagingDir = aBundleDir + ".staging"
+        shutil.rmtree(aStagingDir, ignore_errors=True)
+        os.makedirs(aStagingDir)
+        try:
+            if not aWriter.Write(aModel, cadex.Base_UTF16String(os.path.join(aStagingDir, os.path.basename(theDest)))):
+                return False
+
+            aFiles, self.myUpdatedFiles = CDXWEBSkipCache.__SyncDir(aStagingDir, aBundleDir, anOldFiles)
+        finally:
+            shutil.rmtree(aStagingDir, ignore_errors=True)
+
+        # The manifest is updated last, so an interrupted write is redone on the next run
+        aNewManifest = {"fingerprint": aFingerprint, "files": aFiles}
+        with open(aManifestPath + ".tmp", "w") as aFile:
+            json.dump(aNewManifest, aFile, indent=2, sort_keys=True)
+        os.replace(aManifestPath + ".tmp", aManifestPath)
+        return True
+
+    def __Fingerprint(self, theSource: str) -> str:
+        aHash = ConversionCache.HashFile(theSource)
+        aHash.update(b"\0" + self.myParams.CanonicalString().encode())
+        aHash.update(b"\0" + SDKVersion().encode())
+        return aHash.hexdigest()
+
+    # Moves the files of theSourceDir that differ from the ones in theDestDir there and removes the files
+    # written previously (theOldFiles) which are no longer produced. Returns the list of the bundle files
+    # and the number of files replaced.
+    @staticmethod
+    def __SyncDir(theSourceDir: str, theDestDir: str, theOldFiles: list):
+        anUpdatedFiles = 0
+        aNewFiles = []
+        for aDirPath, aDirNames, aFileNames in os.walk(theSourceDir):
+            for aFileName in aFileNames:
+                aSource = os.path.join(aDirPath, aFileName)
+                aRelPath = os.path.relpath(aSource, theSourceDir).replace(os.sep, "/")
+                aNewFiles.append(aRelPath)
+                aDest = os.path.join(theDestDir, aRelPath)
+                if os.path.isfile(aDest) and CDXWEBSkipCache.__IsSameFile(aSource, aDest):
+                    continue
+                os.makedirs(os.path.dirname(aDest), exist_ok=True)
+                os.replace(aSource, aDest)
+                anUpdatedFiles += 1
+
+        for aRelPath in set(theOldFiles) - set(aNewFiles):
+            aDest = os.path.join(theDestDir, aRelPath)
+            if os.path.isfile(aDest):
+                os.remove(aDest)
+
+        return sorted(aNewFiles), anUpdatedFiles
+
+    @staticmethod
+    def __IsSameFile(theFirst: str, theSecond: str) -> bool:
+        if os.path.getsize(theFirst) != os.path.getsize(theSecond):
+            return False
+        with open(theFirst, "rb") as aFirst, open(theSecond, "rb") as aSecond:
+            while True:
+                aFirstChunk = aFirst.read(1 << 20)
+                if aFirstChunk != aSecond.read(1 << 20):
+                    return False
+                if not aFirstChunk:
+                    return True
+
+    @staticmethod
+    def __ReadManifest(thePath: str) -> dict:
+        try:
+            with open(thePath, "r") as aFile:
+                return json.load(aFile)
+        except (OSError, ValueError):
+            return {}
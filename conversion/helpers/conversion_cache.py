@@ -0,0 +1,184 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+
+# On-disk cache of conversion results.
+# An entry is keyed by the content hash of the source file, the target format and the canonical string
+# of the reader/writer parameters, so byte-identical inputs converted with identical parameters are only
+# converted once. Entries keep all the files the writer produced (e.g. per-part JT files or CDXWEB
+# payloads) and are evicted in least recently used order when the cache exceeds its size limit.
+class ConversionCache:
+    def __init__(self, theDir: str, theMaxSize: int):
+        self.myDir = theDir
+        self.myMaxSize = theMaxSize
+        self.myHits = 0
+        self.myMisses = 0
+
+        os.makedirs(os.path.join(self.myDir, "entries"), exist_ok=True)
+        os.makedirs(os.path.join(self.myDir, "staging"), exist_ok=True)
+
+    @staticmethod
+    def HashFile(thePath: str, theHash = None):
+        aHash = theHash if theHash else hashlib.sha256()
+        with open(thePath, "rb") as aFile:
+            for aChunk in iter(lambda: aFile.read(1 << 20), b""):
+                aHash.update(aChunk)
+        return aHash
+
+    def Key(self, theSource: str, theDest: str, theParamsString: str = "") -> str:
+        aHash = ConversionCache.HashFile(theSource)
+        aHash.update(b"\0" + os.path.splitext(theDest)[1].lower().encode())
+        aHash.update(b"\0" + theParamsString.encode())
+        return aHash.hexdigest()
+
+    # Copies the cached result to theDest (and its sibling files next to it). Returns False on a cache miss.
+    def Fetch(self, theKey: str, theDest: str) -> bool:
+        anEntryDir = self.__EntryDir(theKey)
+        anEntryInfo = ConversionCache.__ReadEntryInfo(anEntryDir)
+        if anEntryInfo is None:
+            self.myMisses += 1
+            return False
+
+        try:
+            ConversionCache.CopyFiles(os.path.join(anEntryDir, "files"), anEntryInfo["main"], theDest)
+
+            # Entry info modification time is used as the last access time for LRU eviction
+            os.utime(os.path.join(anEntryDir, "entry.json"))
+        except (OSError, shutil.Error):
+            # The entry has been evicted by another process meanwhile
+            self.myMisses += 1
+            return False
+        self.myHits += 1
+        return True
+
+    # Copies theMainFileName from theFilesDir to theDest and all the other files and subdirectories next to it
+    @staticmethod
+    def CopyFiles(theFilesDir: str, theMainFileName: str, theDest: str):
+        aDestDir = os.path.dirname(theDest)
+        os.makedirs(aDestDir, exist_ok=True)
+        for anItem in os.listdir(theFilesDir):
+            aSource = os.path.join(theFilesDir, anItem)
+            if anItem == theMainFileName:
+                shutil.copyfile(aSource, theDest)
+            elif os.path.isdir(aSource):
+                ConversionCache.CopyTree(aSource, os.path.join(aDestDir, anItem))
+            else:
+                shutil.copyfile(aSource, os.path.join(aDestDir, anItem))
+
+    # Copies theSourceDir into theDestDir, which may already exist (unlike shutil.copytree() before Python 3.8)
+    @staticmethod
+    def CopyTree(theSourceDir: str, theDestDir: str):
+        os.makedirs(theDestDir, exist_ok=True)
+        for anItem in os.listdir(theSourceDir):
+            aSource = os.path.join(theSourceDir, anItem)
+            if os.path.isdir(aSource):
+                ConversionCache.CopyTree(aSource, os.path.join(theDestDir, anItem))
+            else:
+                shutil.copyfile(aSource, os.path.join(theDestDir, anItem))
+
+    # Returns a new empty directory the conversion result should be written to before calling Store()
+    def NewStagingDir(self) -> str:
+        aStagingDir = os.path.join(self.myDir, "staging", uuid.uuid4().hex)
+        os.makedirs(aStagingDir)
+        return aStagingDir
+
+    def Store(self, theKey: str, theStagingDir: str, theMainFileName: str):
+        anEntryInfo = {"main": theMainFileName, "size": ConversionCache.__DirSize(theStagingDir)}
+        with open(os.path.join(theStagingDir, "entry.json.tmp"), "w") as aFile:
+            json.dump(anEntryInfo, aFile)
+
+        # Build the complete entry aside and publish it with a single rename,
+        # so concurrent readers never see a partially written entry
+        aTmpEntryDir = theStagingDir + ".entry"
+        os.makedirs(aTmpEntryDir)
+        os.rename(os.path.join(theStagingDir, "entry.json.tmp"), os.path.join(aTmpEntryDir, "entry.json"))
+        os.rename(theStagingDir, os.path.join(aTmpEntryDir, "files"))
+
+        anEntryDir = self.__EntryDir(theKey)
+        try:
+            os.rename(aTmpEntryDir, anEntryDir)
+        except OSError:
+            # Another process has already stored the same result
+            shutil.rmtree(aTmpEntryDir, ignore_errors=True)
+
+        self.Evict()
+
+    def Evict(self):
+        anEntries = []
+        aTotalSize = 0
+        anEntriesDir = os.path.join(self.myDir, "entries")
+        for aKey in os.listdir(anEntriesDir):
+            anEntryDir = os.path.join(anEntriesDir, aKey)
+            anEntryInfo = ConversionCache.__ReadEntryInfo(anEntryDir)
+            if anEntryInfo is None:
+                continue
+            try:
+                aLastAccess = os.path.getmtime(os.path.join(anEntryDir, "entry.json"))
+            except OSError:
+                # Evicted by another process meanwhile
+                continue
+            anEntries.append((aLastAccess, anEntryInfo["size"], anEntryDir))
+            aTotalSize += anEntryInfo["size"]
+
+        anEntries.sort()
+        for aLastAccess, aSize, anEntryDir in anEntries:
+            if aTotalSize <= self.myMaxSize:
+                break
+            shutil.rmtree(anEntryDir, ignore_errors=True)
+            aTotalSize -= aSize
+
+    def PrintStatistics(self):
+        aTotal = self.myHits + self.myMisses
+        aHitRate = 100.0 * self.myHits / aTotal if aTotal else 0.0
+        print(f"Cache: {self.myHits} hits, {self.myMisses} misses ({aHitRate:.1f}% hit rate)")
+
+    def __EntryDir(self, theKey: str) -> str:
+        return os.path.join(self.myDir, "entries", theKey)
+
+    @staticmethod
+    def __ReadEntryInfo(theEntryDir: str):
+        try:
+            with open(os.path.join(theEntryDir, "entry.json"), "r") as aFile:
+                return json.load(aFile)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def __DirSize(theDir: str) -> int:
+        aSize = 0
+        for aDirPath, aDirNames, aFileNames in os.walk(theDir):
+            for aFileName in aFileNames:
+                aSize += os.path.getsize(os.path.join(aDirPath, aFileName))
+        return aSize
@@ -0,0 +1,86 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import importlib
+import json
+
+import cadexchanger.CadExCore as cadex
+
+
+# Reader and writer parameters described as plain data instead of SDK objects, e.g.:
+#     {"CadExSTEP.STEP_ReaderParameters": {"PreferredBRepRepresentationType": "AdvancedBRep"},
+#      "CadExJT.JT_WriterParameters":     {"FileSplitMode": "PerPart"}}
+# Every key is "<module>.<parameters class>", every value maps a setter name (without the "Set" prefix)
+# to its argument. Enumeration values are given by name and are looked up in the parameters class
+# first and then in CadExCore. Such a description can be hashed, stored and sent to other processes,
+# and only modules of the formats it mentions are imported.
+class ConversionParameters:
+    def __init__(self, theSpec: dict = None):
+        self.mySpec = theSpec if theSpec else {}
+
+    @staticmethod
+    def FromFile(thePath: str):
+        with open(thePath, "r") as aFile:
+            return ConversionParameters(json.load(aFile))
+
+    def IsEmpty(self) -> bool:
+        return not self.mySpec
+
+    # Returns the same string for equal parameter sets regardless of the keys order
+    def CanonicalString(self) -> str:
+        return json.dumps(self.mySpec, sort_keys=True, separators=(",", ":"))
+
+    def ApplyTo(self, theReader: cadex.ModelData_ModelReader, theWriter: cadex.ModelData_ModelWriter):
+        for aName in sorted(self.mySpec):
+            aParams = ConversionParameters.__Create(aName, self.mySpec[aName])
+            if aName.endswith("ReaderParameters"):
+                if theReader is not None:
+                    theReader.SetReaderParameters(aParams)
+            elif aName.endswith("WriterParameters"):
+                if theWriter is not None:
+                    theWriter.SetWriterParameters(aParams)
+
+    @staticmethod
+    def __Create(theName: str, theValues: dict):
+        aModuleName, aClassName = theName.split(".")
+        aClass = getattr(importlib.import_module("cadexchanger." + aModuleName), aClassName)
+
+        aParams = aClass()
+        for aSetter, aValue in theValues.items():
+            getattr(aParams, "Set" + aSetter)(ConversionParameters.__Resolve(aClass, aValue))
+        return aParams
+
+    @staticmethod
+    def __Resolve(theClass, theValue):
+        if isinstance(theValue, str):
+            if hasattr(theClass, theValue):
+                return getattr(theClass, theValue)
+            if hasattr(cadex, theValue):
+                return getattr(cadex, theValue)
+        return theValue
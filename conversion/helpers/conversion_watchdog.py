@@ -0,0 +1,163 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import datetime
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionJob, ConversionResult, ConversionWorker
+
+
+# Runs every job in its own child process with a wall clock deadline and an address space limit
+# (RLIMIT_AS, where supported). A job that fails, hangs or gets killed is retried once with the fallback
+# parameters applied on top of its own ones, and a job that fails again is appended to the quarantine list
+# (JSON lines). Child processes are started with "spawn", so the supervising process may run several
+# watchdogs from different threads.
+class ConversionWatchdog:
+    # Reading STEP files into the simpler advanced B-Rep representation avoids most of the pathological cases
+    myDefaultFallbackParams = {"CadExSTEP.STEP_ReaderParameters": {"PreferredBRepRepresentationType": "AdvancedBRep"}}
+    myCancelPollTime = 0.5
+    # Time a child which closed the pipe is given to exit before it is considered hung
+    myExitWaitTime = 5.0
+
+    def __init__(self, theTimeout: float = 0.0, theMemoryLimit: int = 0, theFallbackParams: ConversionParameters = None,
+                 theQuarantinePath: str = "", theCacheDir: str = "", theCacheMaxSize: int = 0):
+        self.myTimeout = theTimeout
+        self.myMemoryLimit = theMemoryLimit
+        self.myFallbackParams = theFallbackParams if theFallbackParams else ConversionParameters(
+            ConversionWatchdog.myDefaultFallbackParams)
+        self.myQuarantinePath = theQuarantinePath
+        self.myCacheDir = theCacheDir
+        self.myCacheMaxSize = theCacheMaxSize
+        self.myContext = multiprocessing.get_context("spawn")
+        self.myQuarantineLock = threading.Lock()
+
+    # Setting theCancelEvent kills the running child process, the job is then neither retried nor quarantined
+    def Convert(self, theJob: ConversionJob, theCancelEvent: threading.Event = None) -> ConversionResult:
+        aStartTime = time.perf_counter()
+        aResult = self.__RunChild(theJob, theCancelEvent)
+        aFailures = []
+        if not aResult.myIsOK and not (theCancelEvent and theCancelEvent.is_set()):
+            aFailures.append(aResult.myMessage)
+
+            aSpec = dict(theJob.myParams.mySpec)
+            aSpec.update(self.myFallbackParams.mySpec)
+            aResult = self.__RunChild(ConversionJob(theJob.mySource, theJob.myDest, ConversionParameters(aSpec)),
+                                      theCancelEvent)
+            aResult.myAttemptCount = 2
+            if not aResult.myIsOK and not (theCancelEvent and theCancelEvent.is_set()):
+                aFailures.append(aResult.myMessage)
+                self.__Quarantine(theJob, aFailures)
+
+        aResult.myWallTime = time.perf_counter() - aStartTime
+        return aResult
+
+    def __RunChild(self, theJob: ConversionJob, theCancelEvent: threading.Event) -> ConversionResult:
+        aReceiver, aSender = self.myContext.Pipe(duplex=False)
+        aProcess = self.myContext.Process(target=ConversionWatchdog.RunJob,
+                                          args=(theJob, self.myMemoryLimit, self.myCacheDir, self.myCacheMaxSize, aSender),
+                                          daemon=True)
+        aProcess.start()
+        aSender.close()
+
+        aResult = None
+        anIsCancelled = False
+        anIsClosed = False
+        aDeadline = time.monotonic() + self.myTimeout if self.myTimeout > 0 else None
+        try:
+            while True:
+                aWaitTime = None if aDeadline is None else max(aDeadline - time.monotonic(), 0.0)
+                if theCancelEvent:
+                    aWaitTime = ConversionWatchdog.myCancelPollTime if aWaitTime is None else min(
+                        aWaitTime, ConversionWatchdog.myCancelPollTime)
+                if aReceiver.poll(aWaitTime):
+                    aResult = aReceiver.recv()
+                    break
+                if theCancelEvent and theCancelEvent.is_set():
+                    anIsCancelled = True
+                    break
+                if aDeadline is not None and time.monotonic() >= aDeadline:
+                    break
+        except EOFError:
+            anIsClosed = True
+        aReceiver.close()
+
+        if aResult is None:
+            # A child that died closes the pipe before it is reaped, so it has to be joined before it is classified
+            aProcess.join(ConversionWatchdog.myExitWaitTime if anIsClosed else 0)
+            aResult = ConversionResult(theJob)
+            if aProcess.exitcode is None:
+                aProcess.kill()
+                aProcess.join()
+                if anIsCancelled:
+                    aResult.myMessage = "Cancelled"
+                elif anIsClosed:
+                    aResult.myMessage = "Child process closed the connection without a result and was killed"
+                else:
+                    aResult.myMessage = f"Killed after the timeout of {self.myTimeout:.0f} s"
+            else:
+                aResult.myMessage = f"Child process terminated with exit code {aProcess.exitcode}"
+                # Failed allocations of the native code abort the process (or it gets killed by the system)
+                # instead of raising MemoryError
+                if self.myMemoryLimit > 0 and aProcess.exitcode < 0:
+                    aResult.myMessage += f", probably the memory limit of {self.myMemoryLimit >> 20} MB was exceeded"
+        else:
+            aProcess.join()
+            if self.myMemoryLimit > 0 and aResult.myMessage == ConversionWorker.myOutOfMemoryMessage:
+                aResult.myMessage = f"Memory limit of {self.myMemoryLimit >> 20} MB exceeded"
+        return aResult
+
+    # Entry point of the child process
+    @staticmethod
+    def RunJob(theJob: ConversionJob, theMemoryLimit: int, theCacheDir: str, theCacheMaxSize: int, theSender):
+        if theMemoryLimit > 0:
+            try:
+                import resource
+                resource.setrlimit(resource.RLIMIT_AS, (theMemoryLimit, theMemoryLimit))
+            except (ImportError, ValueError, OSError):
+                pass
+
+        ConversionWorker.Initialize(theCacheDir, theCacheMaxSize)
+        aResult = ConversionWorker.Convert(theJob)
+        theSender.send(aResult)
+        theSender.close()
+
+    def __Quarantine(self, theJob: ConversionJob, theFailures: list):
+        if not self.myQuarantinePath:
+            return
+        aRecord = {"source": theJob.mySource, "dest": theJob.myDest, "params": theJob.myParams.mySpec,
+                   "failures": theFailures, "time": datetime.datetime.now().isoformat(timespec="seconds")}
+        with self.myQuarantineLock:
+            os.makedirs(os.path.dirname(self.myQuarantinePath), exist_ok=True)
+            with open(self.myQuarantinePath, "a") as aFile:
+                aFile.write(json.dumps(aRecord) + "\n")
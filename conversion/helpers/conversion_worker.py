@@ -0,0 +1,154 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import shutil
+import sys
+import time
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+import cadex_license as license
+
+from conversion_cache import ConversionCache
+from conversion_parameters import ConversionParameters
+from stage_profiler import StageProfiler
+
+
+class ConversionJob:
+    def __init__(self, theSource: str, theDest: str, theParams: ConversionParameters = None):
+        self.mySource = theSource
+        self.myDest = theDest
+        self.myParams = theParams if theParams else ConversionParameters()
+
+class ConversionResult:
+    def __init__(self, theJob: ConversionJob):
+        self.mySource = theJob.mySource
+        self.myDest = theJob.myDest
+        self.myIsOK = False
+        self.myMessage = ""
+        self.myWallTime = 0.0
+        self.myIsCacheHit = False
+        self.myWorkerId = os.getpid()
+        self.myAttemptCount = 1
+        self.myDuplicateOf = ""
+
+# Converts jobs inside a long-living process (e.g. a multiprocessing pool worker).
+# License activation and CadEx modules loading happen only once per process and
+# are reused by all the jobs converted by this process afterwards.
+# If a cache directory is given, results are looked up in and stored to a ConversionCache.
+# If CADEX_PROFILE environment variable is set, a stage profile is written next to every result.
+class ConversionWorker:
+    myIsInitialized = False
+    myIsLicenseActive = False
+    myCache = None
+    myOutOfMemoryMessage = "Out of memory"
+
+    @staticmethod
+    def Initialize(theCacheDir: str = "", theCacheMaxSize: int = 0) -> bool:
+        if not ConversionWorker.myIsInitialized:
+            ConversionWorker.myIsInitialized = True
+            if theCacheDir:
+                ConversionWorker.myCache = ConversionCache(theCacheDir, theCacheMaxSize)
+            ConversionWorker.myIsLicenseActive = cadex.LicenseManager.Activate(license.Value())
+            cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        return ConversionWorker.myIsLicenseActive
+
+    @staticmethod
+    def Convert(theJob: ConversionJob) -> ConversionResult:
+        aResult = ConversionResult(theJob)
+        aStartTime = time.perf_counter()
+        aProfiler = StageProfiler(theJob.myDest)
+        if not ConversionWorker.Initialize():
+            aResult.myMessage = "Failed to activate CAD Exchanger license."
+        else:
+            try:
+                if ConversionWorker.myCache:
+                    ConversionWorker.__DoCachedConvert(theJob, aResult, aProfiler)
+                else:
+                    aResult.myIsOK, aResult.myMessage = ConversionWorker.__DoConvert(theJob, aProfiler)
+            except cadex.Base_Exception as anEx:
+                aResult.myMessage = str(anEx.What())
+            except MemoryError:
+                aResult.myMessage = ConversionWorker.myOutOfMemoryMessage
+            except Exception as anEx:
+                aResult.myMessage = "Unhandled exception caught: " + str(anEx)
+            finally:
+                # The profile is written on failure too, the stages done so far are already saved as they end
+                aProfiler.Write(theIsOK=aResult.myIsOK)
+        aResult.myWallTime = time.perf_counter() - aStartTime
+        return aResult
+
+    @staticmethod
+    def __DoCachedConvert(theJob: ConversionJob, theResult: ConversionResult, theProfiler: StageProfiler):
+        aCache = ConversionWorker.myCache
+        with theProfiler.Stage("cache lookup"):
+            aKey = aCache.Key(theJob.mySource, theJob.myDest, theJob.myParams.CanonicalString())
+            anIsCacheHit = aCache.Fetch(aKey, theJob.myDest)
+        if anIsCacheHit:
+            theResult.myIsOK = True
+            theResult.myIsCacheHit = True
+            return
+
+        # The result is written to a staging directory first, so that all the files produced by the writer
+        # get into the cache entry, and is then copied to the requested destination
+        aStagingDir = aCache.NewStagingDir()
+        aMainFileName = os.path.basename(theJob.myDest)
+        aStagingJob = ConversionJob(theJob.mySource, os.path.join(aStagingDir, aMainFileName), theJob.myParams)
+        theResult.myIsOK, theResult.myMessage = ConversionWorker.__DoConvert(aStagingJob, theProfiler)
+        if not theResult.myIsOK:
+            shutil.rmtree(aStagingDir, ignore_errors=True)
+            return
+
+        with theProfiler.Stage("cache store"):
+            ConversionCache.CopyFiles(aStagingDir, aMainFileName, theJob.myDest)
+            aCache.Store(aKey, aStagingDir, aMainFileName)
+
+    @staticmethod
+    def __DoConvert(theJob: ConversionJob, theProfiler: StageProfiler):
+        aModel = cadex.ModelData_Model()
+
+        aReader = cadex.ModelData_ModelReader()
+        aWriter = cadex.ModelData_ModelWriter()
+        theJob.myParams.ApplyTo(aReader, aWriter)
+
+        with theProfiler.Stage("read"):
+            if not aReader.Read(cadex.Base_UTF16String(theJob.mySource), aModel):
+                return False, "Failed to open and convert the file " + theJob.mySource
+
+        os.makedirs(os.path.dirname(theJob.myDest), exist_ok=True)
+
+        with theProfiler.Stage("write"):
+            if not aWriter.Write(aModel, cadex.Base_UTF16String(theJob.myDest)):
+                return False, "Failed to convert and write the file to specified format " + theJob.myDest
+
+        return True, ""
@@ -0,0 +1,105 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import shutil
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from conversion_cache import ConversionCache
+from conversion_worker import ConversionJob, ConversionResult
+
+
+# Groups jobs whose sources are byte-identical (e.g. the same part uploaded under different names) and which
+# are converted with the same parameters into the same format. Only the first job of every group is to be
+# converted, the outputs of the others are made from its output afterwards (as hard links where possible).
+class DuplicateInputs:
+    def __init__(self, theJobs: list, theWorkerCount: int = 0):
+        # Hashing is mostly I/O, so several files are read at once
+        with ThreadPoolExecutor(max_workers=theWorkerCount if theWorkerCount > 0 else os.cpu_count()) as anExecutor:
+            aHashes = list(anExecutor.map(DuplicateInputs.__Hash, theJobs))
+
+        self.myUniqueJobs = []
+        self.myDuplicates = {}
+        aGroups = {}
+        for aJob, aHash in zip(theJobs, aHashes):
+            aKey = (aHash, os.path.splitext(aJob.myDest)[1].lower(), aJob.myParams.CanonicalString())
+            aFirstJob = aGroups.get(aKey) if aHash else None
+            if aFirstJob is None:
+                aGroups[aKey] = aJob
+                self.myUniqueJobs.append(aJob)
+            else:
+                self.myDuplicates.setdefault(aFirstJob.myDest, []).append(aJob)
+
+    def DuplicateCount(self) -> int:
+        return sum(len(aJobs) for aJobs in self.myDuplicates.values())
+
+    # Makes the outputs of the duplicates of the job theResult belongs to and returns their results
+    def Materialize(self, theResult: ConversionResult) -> list:
+        aResults = []
+        for aJob in self.myDuplicates.get(theResult.myDest, []):
+            aResult = ConversionResult(aJob)
+            aResult.myDuplicateOf = theResult.mySource
+            aStartTime = time.perf_counter()
+            if not theResult.myIsOK:
+                aResult.myMessage = theResult.myMessage
+            else:
+                try:
+                    DuplicateInputs.__Link(theResult.myDest, aJob.myDest)
+                    aResult.myIsOK = True
+                except OSError as anEx:
+                    aResult.myMessage = "Failed to create the output of a duplicate: " + str(anEx)
+            aResult.myWallTime = time.perf_counter() - aStartTime
+            aResults.append(aResult)
+        return aResults
+
+    @staticmethod
+    def __Hash(theJob: ConversionJob) -> str:
+        try:
+            return ConversionCache.HashFile(theJob.mySource).hexdigest()
+        except OSError:
+            # Unreadable sources are never grouped, their jobs fail on their own
+            return ""
+
+    @staticmethod
+    def __Link(theSource: str, theDest: str):
+        if os.path.abspath(theSource) == os.path.abspath(theDest):
+            return
+        os.makedirs(os.path.dirname(theDest), exist_ok=True)
+        if os.path.isdir(theSource):
+            ConversionCache.CopyTree(theSource, theDest)
+            return
+        if os.path.lexists(theDest):
+            os.remove(theDest)
+        try:
+            os.link(theSource, theDest)
+        except OSError:
+            # E.g. another file system or a file system without hard links
+            shutil.copy2(theSource, theDest)
@@ -0,0 +1,116 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import importlib
+import os
+import re
+
+
+# Describes a file format supported by a dedicated CadEx reader module.
+# The signature is a regular expression the beginning of a file of this format matches (None if the format
+# has no reliable signature).
+class FormatInfo:
+    def __init__(self, theName: str, theExtensions: tuple, theModule: str, theReader: str, theReaderParameters: str,
+                 theSignature: bytes = None):
+        self.myName = theName
+        self.myExtensions = theExtensions
+        self.myModule = theModule
+        self.myReader = theReader
+        self.myReaderParameters = theReaderParameters
+        self.mySignature = re.compile(theSignature, re.DOTALL) if theSignature else None
+
+    def MatchesHeader(self, theHeader: bytes) -> bool:
+        return self.mySignature is not None and self.mySignature.match(theHeader) is not None
+
+    # Imports the reader module on demand. Returns None if the module is not available.
+    def Module(self):
+        try:
+            return importlib.import_module("cadexchanger." + self.myModule)
+        except ImportError:
+            return None
+
+    # Returns a new format specific reader (with separate ReadFile() and Transfer() steps) or None
+    def CreateReader(self):
+        aModule = self.Module()
+        if aModule is None or not hasattr(aModule, self.myReader):
+            return None
+        return getattr(aModule, self.myReader)()
+
+    # Returns the name of the reader parameters class as used by ConversionParameters
+    def ReaderParametersName(self) -> str:
+        return self.myModule + "." + self.myReaderParameters
+
+class FormatRegistry:
+    # IFC files are STEP (ISO 10303-21) files as well, so IFC must be matched before STEP
+    myFormats = [
+        FormatInfo("ACIS",       (".sat", ".sab"),            "CadExACIS",  "ACIS_Reader",  "ACIS_ReaderParameters",
+                   rb"(?:\d+ \d+ \d+ \d+[^\n]*\n[^\n]*ACIS|ACIS BinaryFile)"),
+        FormatInfo("DWG",        (".dwg",),                   "CadExDWG",   "DWG_Reader",   "DWG_ReaderParameters",
+                   rb"AC10\d\d"),
+        FormatInfo("IFC",        (".ifc",),                   "CadExIFC",   "IFC_Reader",   "IFC_ReaderParameters",
+                   rb"(?:\xef\xbb\xbf)?\s*ISO-10303-21;.*?FILE_SCHEMA\s*\(\s*\(\s*'IFC"),
+        FormatInfo("IGES",       (".igs", ".iges"),           "CadExIGES",  "IGES_Reader",  "IGES_ReaderParameters",
+                   rb"[^\r\n]{72}S[ \d]{7}\r?\n"),
+        FormatInfo("JT",         (".jt",),                    "CadExJT",    "JT_Reader",    "JT_ReaderParameters",
+                   rb"Version \d+\.\d+ JT"),
+        FormatInfo("OBJ",        (".obj",),                   "CadExOBJ",   "OBJ_Reader",   "OBJ_ReaderParameters"),
+        FormatInfo("Parasolid",  (".x_t", ".x_b", ".xmt_txt"), "CadExPara",  "Para_Reader",  "Para_ReaderParameters",
+                   rb"\*\*ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+        FormatInfo("SolidWorks", (".sldprt", ".sldasm"),      "CadExSLD",   "SLD_Reader",   "SLD_ReaderParameters"),
+        FormatInfo("STEP",       (".stp", ".step"),           "CadExSTEP",  "STEP_Reader",  "STEP_ReaderParameters",
+                   rb"(?:\xef\xbb\xbf)?\s*ISO-10303-21;"),
+        FormatInfo("STL",        (".stl",),                   "CadExSTL",   "STL_Reader",   "STL_ReaderParameters",
+                   rb"solid\s"),
+        FormatInfo("VRML",       (".wrl", ".vrml"),           "CadExVRML",  "VRML_Reader",  "VRML_ReaderParameters",
+                   rb"#VRML V"),
+    ]
+
+    # Returns FormatInfo for the file extension or None (e.g. for native formats read by ModelData_ModelReader only)
+    @staticmethod
+    def ByExtension(thePath: str):
+        anExtension = os.path.splitext(thePath)[1].lower()
+        for aFormat in FormatRegistry.myFormats:
+            if anExtension in aFormat.myExtensions:
+                return aFormat
+        return None
+
+    # Returns FormatInfo for the file contents (e.g. for files with missing or wrong extensions) or, if the
+    # contents are not recognized, for the file extension
+    @staticmethod
+    def Sniff(thePath: str):
+        try:
+            with open(thePath, "rb") as aFile:
+                aHeader = aFile.read(8192)
+        except OSError:
+            aHeader = b""
+
+        for aFormat in FormatRegistry.myFormats:
+            if aFormat.MatchesHeader(aHeader):
+                return aFormat
+        return FormatRegistry.ByExtension(thePath)
@@ -0,0 +1,125 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+
+from format_registry import FormatRegistry
+
+
+# Orders conversion jobs by their estimated cost:
+#     "fifo" - in the order of submission,
+#     "sjf"  - shortest job first, minimizes the mean completion latency,
+#     "ljf"  - largest job first, minimizes the total time (makespan) of a batch on several workers.
+# The cost of a job is the size of its source divided by the throughput of the source format (bytes per second).
+# Without measurements the throughputs are static per-format priors: rough relative reading speeds of the formats
+# (e.g. mesh formats are parsed much faster than B-Rep ones of the same size). Throughputs can be learned from
+# the results of the previous batches and kept in a JSON file. The learned throughput of a format replaces its
+# prior, the priors of formats without measurements are scaled by the mean ratio of learned to prior throughputs,
+# so that they match the speed of the machine.
+class JobScheduler:
+    myPolicies = ("fifo", "sjf", "ljf")
+
+    # Bytes per second
+    myThroughputPriors = {
+        "ACIS":       2.0e6,
+        "DWG":        2.0e6,
+        "IFC":        0.5e6,
+        "IGES":       1.5e6,
+        "JT":         5.0e6,
+        "OBJ":        20.0e6,
+        "Parasolid":  3.0e6,
+        "SolidWorks": 1.0e6,
+        "STEP":       1.0e6,
+        "STL":        50.0e6,
+        "VRML":       10.0e6,
+    }
+    myDefaultThroughputPrior = 2.0e6
+
+    def __init__(self, thePolicy: str = "fifo", theModelPath: str = ""):
+        self.myPolicy = thePolicy
+        self.myModelPath = theModelPath
+        self.myModel = {}
+        if theModelPath and os.path.isfile(theModelPath):
+            with open(theModelPath, "r") as aFile:
+                self.myModel = json.load(aFile)
+
+    @staticmethod
+    def FormatName(thePath: str) -> str:
+        aFormat = FormatRegistry.Sniff(thePath)
+        return aFormat.myName if aFormat else os.path.splitext(thePath)[1].lower()
+
+    @staticmethod
+    def ThroughputPrior(theFormatName: str) -> float:
+        return JobScheduler.myThroughputPriors.get(theFormatName, JobScheduler.myDefaultThroughputPrior)
+
+    def Throughput(self, theFormatName: str) -> float:
+        aThroughputs = {aName: aStat["bytes"] / aStat["seconds"] for aName, aStat in self.myModel.items() if aStat["seconds"] > 0}
+        if theFormatName in aThroughputs:
+            return aThroughputs[theFormatName]
+        aPrior = JobScheduler.ThroughputPrior(theFormatName)
+        if aThroughputs:
+            aScale = sum(aThroughput / JobScheduler.ThroughputPrior(aName) for aName, aThroughput in aThroughputs.items())
+            return aPrior * aScale / len(aThroughputs)
+        return aPrior
+
+    # Returns the estimated conversion time in seconds
+    def Cost(self, theSource: str) -> float:
+        try:
+            aSize = os.path.getsize(theSource)
+        except OSError:
+            aSize = 0
+        return aSize / self.Throughput(JobScheduler.FormatName(theSource))
+
+    def Order(self, theJobs: list) -> list:
+        if self.myPolicy == "fifo":
+            return list(theJobs)
+        aCosts = {id(aJob): self.Cost(aJob.mySource) for aJob in theJobs}
+        return sorted(theJobs, key=lambda theJob: aCosts[id(theJob)], reverse=(self.myPolicy == "ljf"))
+
+    # Adds the measurements of successful conversions (except cache hits, retries and duplicates) to the model and saves it
+    def Learn(self, theResults: list):
+        if not self.myModelPath:
+            return
+        for aResult in theResults:
+            if not aResult.myIsOK or aResult.myIsCacheHit or aResult.myAttemptCount > 1 or aResult.myDuplicateOf:
+                continue
+            try:
+                # The source may have been removed or replaced since the conversion
+                aSize = os.path.getsize(aResult.mySource)
+            except OSError:
+                continue
+            aStat = self.myModel.setdefault(JobScheduler.FormatName(aResult.mySource), {"bytes": 0, "seconds": 0.0})
+            aStat["bytes"] += aSize
+            aStat["seconds"] += aResult.myWallTime
+
+        os.makedirs(os.path.dirname(self.myModelPath), exist_ok=True)
+        with open(self.myModelPath + ".tmp", "w") as aFile:
+            json.dump(self.myModel, aFile, indent=2, sort_keys=True)
+        os.replace(self.myModelPath + ".tmp", self.myModelPath)
@@ -0,0 +1,113 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cadexchanger.CadExCore as cadex
+
+
+class BRepPartCollector(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myParts = []
+        self.myVisitedParts = set()
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        if thePart not in self.myVisitedParts and thePart.BRepRepresentation():
+            self.myVisitedParts.add(thePart)
+            self.myParts.append(thePart)
+
+# Adds polygonal representations of several levels of detail to every part with a B-Rep representation.
+# Parts are meshed in parallel, all the LODs of one part are computed by the same thread one after another,
+# so a B-Rep representation is never meshed by several threads at once. The B-Rep of every part is converted
+# on the calling thread right before the part is queued, so with delayed conversion the meshing of the converted
+# parts overlaps the conversion of the next ones and meshing threads only read already converted B-Rep data.
+# The meshes are added to the parts afterwards, LODs a part already has (e.g. read from the file) are kept.
+# If theIsEmbeddedMeshReused is True, a part with a polygonal representation of any LOD is not meshed at all.
+# The added meshes are remembered, so that RemoveAdded() can take them off the parts again.
+class LODMesher:
+    myLODs = {
+        "coarse": (cadex.ModelAlgo_BRepMesherParameters.Coarse, cadex.ModelData_RM_CoarseLOD),
+        "medium": (cadex.ModelAlgo_BRepMesherParameters.Medium, cadex.ModelData_RM_MediumLOD),
+        "fine":   (cadex.ModelAlgo_BRepMesherParameters.Fine,   cadex.ModelData_RM_FineLOD),
+    }
+
+    def __init__(self, theLODs: list = None, theWorkerCount: int = 0, theIsEmbeddedMeshReused: bool = False):
+        self.myLODNames = theLODs if theLODs else ["coarse", "medium", "fine"]
+        self.myWorkerCount = theWorkerCount if theWorkerCount > 0 else os.cpu_count()
+        self.myIsEmbeddedMeshReused = theIsEmbeddedMeshReused
+        self.myAddedRepresentations = []
+
+    # Returns the number of meshes added
+    def Compute(self, theModel: cadex.ModelData_Model) -> int:
+        # Only the scene graph is traversed here, representations are not converted
+        aCollector = BRepPartCollector()
+        theModel.AcceptElementVisitor(aCollector)
+
+        aTasks = []
+        aFutures = []
+        with ThreadPoolExecutor(max_workers=self.myWorkerCount) as anExecutor:
+            for aPart in aCollector.myParts:
+                if self.myIsEmbeddedMeshReused and aPart.PolyRepresentation(cadex.ModelData_RM_Any):
+                    continue
+
+                aMesherLODs = []
+                for aLODName in self.myLODNames:
+                    aMesherLOD, aRepresentationMask = LODMesher.myLODs[aLODName]
+                    if not aPart.PolyRepresentation(aRepresentationMask):
+                        aMesherLODs.append(aMesherLOD)
+                if not aMesherLODs:
+                    continue
+
+                aPart.BRepRepresentation().Get()
+                aTasks.append((aPart, aMesherLODs))
+                aFutures.append(anExecutor.submit(LODMesher.__Mesh, aPart, aMesherLODs))
+
+            aPolys = [aFuture.result() for aFuture in aFutures]
+
+        aMeshCount = 0
+        for (aPart, aMesherLODs), aPartPolys in zip(aTasks, aPolys):
+            for aPoly in aPartPolys:
+                aPart.AddRepresentation(aPoly)
+                self.myAddedRepresentations.append((aPart, aPoly))
+            aMeshCount += len(aPartPolys)
+        return aMeshCount
+
+    # Removes the meshes added by Compute() from the parts, the meshes read from the file are kept
+    def RemoveAdded(self):
+        for aPart, aPoly in self.myAddedRepresentations:
+            aPart.RemoveRepresentation(aPoly)
+        self.myAddedRepresentations = []
+
+    @staticmethod
+    def __Mesh(thePart: cadex.ModelData_Part, theLODs: list) -> list:
+        aBRep = thePart.BRepRepresentation()
+        return [cadex.ModelAlgo_BRepMesher(cadex.ModelAlgo_BRepMesherParameters(aLOD)).Compute(aBRep) for aLOD in theLODs]
@@ -0,0 +1,68 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+
+# Returns the current resident set size of the process in bytes or 0 if it cannot be determined
+def CurrentRSS() -> int:
+    try:
+        with open("/proc/self/status", "r") as aFile:
+            for aLine in aFile:
+                if aLine.startswith("VmRSS:"):
+                    return int(aLine.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+# Returns the peak resident set size of the current process in bytes or 0 if it cannot be determined
+def PeakRSS() -> int:
+    try:
+        with open("/proc/self/status", "r") as aFile:
+            for aLine in aFile:
+                if aLine.startswith("VmHWM:"):
+                    return int(aLine.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        aMaxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return aMaxRSS if sys.platform == "darwin" else aMaxRSS * 1024
+    except ImportError:
+        return 0
+
+# Resets the peak resident set size of the current process to the current one, so that PeakRSS() returns
+# the peak since this call. Returns False if this is not supported (only Linux 4.0+ supports it).
+def ResetPeakRSS() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as aFile:
+            aFile.write("5")
+        return True
+    except OSError:
+        return False
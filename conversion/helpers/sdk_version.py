@@ -0,0 +1,53 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+
+
+# Version of the installed CAD Exchanger SDK package, e.g. to tell apart results of different SDK builds.
+# If the package metadata is not available (e.g. the SDK is not installed with pip), the build is identified
+# by the size and the modification time of theModule (CadExCore by default), or "unknown" is returned.
+def SDKVersion(theModule = None) -> str:
+    try:
+        if sys.version_info >= (3, 8):
+            import importlib.metadata
+            return importlib.metadata.version("cadexchanger")
+        import pkg_resources
+        return pkg_resources.get_distribution("cadexchanger").version
+    except Exception:
+        pass
+
+    try:
+        if theModule is None:
+            import cadexchanger.CadExCore as theModule
+        aStat = os.stat(theModule.__file__)
+        return f"{aStat.st_size} {aStat.st_mtime_ns}"
+    except (ImportError, AttributeError, TypeError, OSError):
+        return "unknown"
@@ -0,0 +1,159 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import datetime
+import json
+import os
+import socket
+import time
+import uuid
+
+from conversion_parameters import ConversionParameters
+from conversion_worker import ConversionJob, ConversionResult
+
+
+# A job queue kept in a directory shared by all the workers (e.g. on an NFS volume), no broker is needed.
+# Every job is a JSON file moving between the "pending", "claimed", "done" and "failed" subdirectories.
+# All the moves are renames, which are atomic within one file system, so exactly one worker wins a claim.
+# A claimed job is leased: its owner touches the file regularly (heartbeat) and any worker may return a job
+# whose file was not touched for longer than the lease time to "pending" (e.g. after the owner host died).
+# The number of attempts is kept in the file name: "<job id>~<attempt>.json".
+# Every worker appends the finished jobs to its own journal file in "journal", as appending to one shared file
+# from several hosts is not safe on network file systems. Hosts are expected to have synchronized clocks.
+class SpoolQueue:
+    def __init__(self, theDir: str, theMaxAttempts: int = 3):
+        self.myDir = theDir
+        self.myMaxAttempts = theMaxAttempts
+        self.myWorkerId = f"{socket.gethostname()}-{os.getpid()}"
+        for aSubDir in ("pending", "claimed", "done", "failed", "journal", "tmp"):
+            os.makedirs(os.path.join(self.myDir, aSubDir), exist_ok=True)
+
+    def Submit(self, theJob: ConversionJob) -> str:
+        # Job ids start with the submission time, so that pending jobs are claimed in the submission order
+        aJobId = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f") + "-" + uuid.uuid4().hex[:8]
+        aJob = {"id": aJobId, "source": theJob.mySource, "dest": theJob.myDest, "params": theJob.myParams.mySpec}
+
+        aTmpPath = os.path.join(self.myDir, "tmp", aJobId + ".json")
+        with open(aTmpPath, "w") as aFile:
+            json.dump(aJob, aFile)
+        os.rename(aTmpPath, self.__Path("pending", aJobId, 1))
+        return aJobId
+
+    # Returns the name of the claimed job file and the job, or (None, None) if there are no pending jobs
+    def Claim(self):
+        for aFileName in sorted(os.listdir(os.path.join(self.myDir, "pending"))):
+            aPendingPath = os.path.join(self.myDir, "pending", aFileName)
+            aClaimedPath = os.path.join(self.myDir, "claimed", aFileName)
+            try:
+                # The lease starts now, not when the job was submitted. The file is touched before the rename
+                # (which keeps the modification time), so it never appears in "claimed" with an expired lease.
+                os.utime(aPendingPath)
+                os.rename(aPendingPath, aClaimedPath)
+            except OSError:
+                # Claimed by another worker in the meantime
+                continue
+
+            with open(aClaimedPath, "r") as aFile:
+                aJob = json.load(aFile)
+            return aFileName, ConversionJob(aJob["source"], aJob["dest"], ConversionParameters(aJob["params"]))
+        return None, None
+
+    # Extends the lease, returns False if the job is no longer claimed by this worker (e.g. it was reaped)
+    def Heartbeat(self, theFileName: str) -> bool:
+        try:
+            os.utime(os.path.join(self.myDir, "claimed", theFileName))
+            return True
+        except OSError:
+            return False
+
+    def Complete(self, theFileName: str, theResult: ConversionResult):
+        aState = "done" if theResult.myIsOK else "failed"
+        try:
+            os.rename(os.path.join(self.myDir, "claimed", theFileName), os.path.join(self.myDir, aState, theFileName))
+        except OSError:
+            # The lease has expired and the job was returned to the queue, the result is recorded anyway
+            pass
+
+        aRecord = {"job": theFileName, "state": aState, "source": theResult.mySource, "dest": theResult.myDest,
+                   "message": theResult.myMessage, "wallTime": theResult.myWallTime, "worker": self.myWorkerId,
+                   "time": datetime.datetime.now().isoformat(timespec="seconds")}
+        with open(os.path.join(self.myDir, "journal", self.myWorkerId + ".jsonl"), "a") as aFile:
+            aFile.write(json.dumps(aRecord) + "\n")
+
+    # Returns jobs with expired leases to "pending" (or moves them to "failed" after the last attempt).
+    # Returns the number of jobs reaped.
+    def Reap(self, theLeaseTime: float) -> int:
+        aReapedCount = 0
+        aClaimedDir = os.path.join(self.myDir, "claimed")
+        for aFileName in os.listdir(aClaimedDir):
+            aClaimedPath = os.path.join(aClaimedDir, aFileName)
+            try:
+                # Opening the file revalidates its cached attributes on NFS (close-to-open consistency),
+                # so a heartbeat or a claim of another host is not missed
+                with open(aClaimedPath, "r") as aFile:
+                    if time.time() - os.fstat(aFile.fileno()).st_mtime < theLeaseTime:
+                        continue
+            except OSError:
+                continue
+
+            aJobId, anAttempt = SpoolQueue.__ParseFileName(aFileName)
+            if anAttempt < self.myMaxAttempts:
+                aNewPath = self.__Path("pending", aJobId, anAttempt + 1)
+            else:
+                aNewPath = os.path.join(self.myDir, "failed", aFileName)
+            try:
+                os.rename(aClaimedPath, aNewPath)
+                aReapedCount += 1
+            except OSError:
+                pass
+        return aReapedCount
+
+    # Returns the number of jobs in every state
+    def Counts(self) -> dict:
+        return {aState: len(os.listdir(os.path.join(self.myDir, aState))) for aState in ("pending", "claimed", "done", "failed")}
+
+    # Returns the records of all the workers' journals ordered by time
+    def Journal(self) -> list:
+        aRecords = []
+        aJournalDir = os.path.join(self.myDir, "journal")
+        for aFileName in os.listdir(aJournalDir):
+            with open(os.path.join(aJournalDir, aFileName), "r") as aFile:
+                for aLine in aFile:
+                    if aLine.strip():
+                        aRecords.append(json.loads(aLine))
+        aRecords.sort(key=lambda theRecord: theRecord["time"])
+        return aRecords
+
+    def __Path(self, theState: str, theJobId: str, theAttempt: int) -> str:
+        return os.path.join(self.myDir, theState, f"{theJobId}~{theAttempt}.json")
+
+    @staticmethod
+    def __ParseFileName(theFileName: str):
+        aJobId, anAttempt = os.path.splitext(theFileName)[0].rsplit("~", 1)
+        return aJobId, int(anAttempt)
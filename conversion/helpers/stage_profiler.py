@@ -0,0 +1,140 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+from process_memory import CurrentRSS, PeakRSS
+
+
+# Records wall time, CPU time and memory usage of named conversion stages (reading, transfer, meshing, writing...)
+# and saves them as a JSON profile next to the output file. The memory usage is sampled by a background thread,
+# so the peak of a stage is known even if it is freed before the stage ends. Where the current memory usage is
+# not available (no /proc), the peak memory usage of the process so far is reported instead.
+# If the output file is given on construction, the profile is saved every time a stage starts or ends, with
+# "status" set to "running" and "currentStage" naming the unfinished stage, so a process that crashes or is killed
+# (e.g. by the OOM killer) still leaves the stages done so far and the one it died in. Write() saves the final
+# profile with "status" set to "completed" or "failed".
+# The profiler is disabled unless the CADEX_PROFILE environment variable is set (to anything except "0"),
+# a disabled profiler does nothing and costs nothing.
+class StageProfiler:
+    def __init__(self, theDest: str = "", theIsEnabled: bool = None, theSamplingInterval: float = 0.01):
+        self.myIsEnabled = StageProfiler.IsRequested() if theIsEnabled is None else theIsEnabled
+        self.myDest = theDest
+        self.mySamplingInterval = theSamplingInterval
+        self.myStages = []
+        self.myActivePeaks = []
+        self.myLock = threading.Lock()
+        self.myStopEvent = threading.Event()
+        self.mySampler = None
+
+    @staticmethod
+    def IsRequested() -> bool:
+        return os.environ.get("CADEX_PROFILE", "0") != "0"
+
+    @contextlib.contextmanager
+    def Stage(self, theName: str):
+        if not self.myIsEnabled:
+            yield
+            return
+
+        if self.mySampler is None:
+            self.mySampler = threading.Thread(target=self.__Sample, daemon=True)
+            self.mySampler.start()
+
+        aStartRSS = StageProfiler.__RSS()
+        aPeak = [aStartRSS]
+        with self.myLock:
+            self.myActivePeaks.append(aPeak)
+
+        self.__Save("running", theName)
+
+        aWallStart = time.perf_counter()
+        aCPUStart = time.process_time()
+        try:
+            yield
+        finally:
+            aWall = time.perf_counter() - aWallStart
+            aCPU = time.process_time() - aCPUStart
+            anEndRSS = StageProfiler.__RSS()
+            with self.myLock:
+                self.myActivePeaks.remove(aPeak)
+            self.myStages.append({"name": theName, "wall": aWall, "cpu": aCPU, "startRSS": aStartRSS,
+                                  "endRSS": anEndRSS, "peakRSS": max(aPeak[0], anEndRSS)})
+            self.__Save("running")
+
+    # Stops sampling and writes the final profile to "<theDest>.profile.json" (theDest defaults to the output file
+    # given on construction). Returns the profile path or an empty string if the profiler is disabled.
+    def Write(self, theDest: str = "", theIsOK: bool = True) -> str:
+        if not self.myIsEnabled:
+            return ""
+
+        self.Stop()
+
+        if theDest:
+            self.myDest = theDest
+        return self.__Save("completed" if theIsOK else "failed")
+
+    def Stop(self):
+        if self.mySampler is not None:
+            self.myStopEvent.set()
+            self.mySampler.join()
+            self.mySampler = None
+            self.myStopEvent.clear()
+
+    # The profile is written to a temporary file and then renamed, so it is never seen half-written
+    def __Save(self, theStatus: str, theCurrentStage: str = "") -> str:
+        if not self.myDest:
+            return ""
+
+        aProfile = {"output": self.myDest, "pid": os.getpid(), "status": theStatus, "peakRSS": PeakRSS(),
+                    "stages": self.myStages}
+        if theCurrentStage:
+            aProfile["currentStage"] = theCurrentStage
+        aProfilePath = self.myDest + ".profile.json"
+        os.makedirs(os.path.dirname(os.path.abspath(aProfilePath)), exist_ok=True)
+        aTempPath = aProfilePath + ".tmp"
+        with open(aTempPath, "w") as aFile:
+            json.dump(aProfile, aFile, indent=2)
+        os.replace(aTempPath, aProfilePath)
+        return aProfilePath
+
+    def __Sample(self):
+        while not self.myStopEvent.wait(self.mySamplingInterval):
+            aRSS = StageProfiler.__RSS()
+            with self.myLock:
+                for aPeak in self.myActivePeaks:
+                    aPeak[0] = max(aPeak[0], aRSS)
+
+    @staticmethod
+    def __RSS() -> int:
+        return CurrentRSS() or PeakRSS()
@@ -0,0 +1,110 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import cadexchanger.CadExCore as cadex
+
+from conversion_parameters import ConversionParameters
+from format_registry import FormatRegistry
+
+
+# Reads the model with delayed conversion of geometry: the scene graph (assemblies, instances, parts,
+# names and properties) is built, while B-Rep and Poly representations are only converted by their
+# data providers on first access. As long as representations are not accessed (e.g. BRepRepresentation().Get()
+# is not called) this takes a fraction of the full import time and memory.
+def ReadStructure(theSource: str, theModel: cadex.ModelData_Model) -> bool:
+    aReader = cadex.ModelData_ModelReader()
+
+    aFormat = FormatRegistry.Sniff(theSource)
+    if aFormat is not None and aFormat.Module() is not None:
+        aParams = ConversionParameters({aFormat.ReaderParametersName(): {"DelayedConversion": True}})
+        aParams.ApplyTo(aReader, None)
+
+    return aReader.Read(cadex.Base_UTF16String(theSource), theModel)
+
+class StructureNode:
+    def __init__(self, theType: str, theName: str, theProperties: dict):
+        self.myType = theType
+        self.myName = theName
+        self.myProperties = theProperties
+        self.myChildren = []
+
+class PropertyCollector(cadex.ModelData_PropertyTable_VoidVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myProperties = {}
+
+    def VisitI32(self, theName: cadex.Base_UTF16String, theValue):
+        self.myProperties[str(theName)] = theValue
+
+    def VisitDouble(self, theName: cadex.Base_UTF16String, theValue):
+        self.myProperties[str(theName)] = theValue
+
+    def VisitUTF16String(self, theName: cadex.Base_UTF16String, theValue: cadex.Base_UTF16String):
+        self.myProperties[str(theName)] = str(theValue)
+
+# Builds a tree of StructureNode objects and counts occurrences of every scene graph element.
+# Only the scene graph is traversed, part representations are never accessed, so no data providers are flushed.
+class StructureVisitor(cadex.ModelData_Model_ElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myRoots = []
+        self.myOccurrences = {}
+        self.myStack = []
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        self.__AddNode(thePart, "Part")
+
+    def VisitEnterAssembly(self, theAssembly: cadex.ModelData_Assembly) -> bool:
+        self.myStack.append(self.__AddNode(theAssembly, "Assembly"))
+        return True
+
+    def VisitLeaveAssembly(self, theAssembly: cadex.ModelData_Assembly):
+        self.myStack.pop()
+
+    def VisitEnterInstance(self, theInstance: cadex.ModelData_Instance) -> bool:
+        self.myStack.append(self.__AddNode(theInstance, "Instance"))
+        return True
+
+    def VisitLeaveInstance(self, theInstance: cadex.ModelData_Instance):
+        self.myStack.pop()
+
+    def __AddNode(self, theSGE: cadex.ModelData_SceneGraphElement, theType: str) -> StructureNode:
+        aCollector = PropertyCollector()
+        aPT = theSGE.Properties()
+        if aPT and not aPT.IsEmpty():
+            aPT.Accept(aCollector)
+
+        aNode = StructureNode(theType, str(theSGE.Name()), aCollector.myProperties)
+        if self.myStack:
+            self.myStack[-1].myChildren.append(aNode)
+        else:
+            self.myRoots.append(aNode)
+
+        self.myOccurrences[theSGE] = self.myOccurrences.get(theSGE, 0) + 1
+        return aNode
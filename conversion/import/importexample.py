@@ -38,8 +38,11 @@ import cadexchanger.CadExCore as cadex
 import cadexchanger.CadExSTEP as step
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
 import cadex_license as license
 
+from stage_profiler import StageProfiler
+
 
 def main(theSource: str, theDest: str):
     aKey = license.Value()
@@ -58,24 +61,37 @@ def main(theSource: str, theDest: str):
 
     aModel = cadex.ModelData_Model()
 
-    # Reading the file
-    if not aReader.ReadFile(cadex.Base_UTF16String(theSource)):
-        print("Failed to read the file " + theSource)
-        return 1
-
-    # Making a model data
-    if not aReader.Transfer(aModel):
-        print("Failed to transfer the model into inner format")
-        return 1
-
-    # Now we can get some model data
-    print(f"Model name: {aModel.Name()}")
-    print(f"Number of roots: {aModel.NumberOfRoots()}")
-
-    # Saving the cdx file
-    if not cadex.ModelData_ModelWriter().Write(aModel, cadex.Base_UTF16String(theDest)):
-        print("Failed to save the .cdx file")
-        return 1
+    # Records time and memory of every stage if CADEX_PROFILE environment variable is set
+    aProfiler = StageProfiler(theDest)
+
+    anIsOK = False
+    try:
+        # Reading the file
+        with aProfiler.Stage("read"):
+            if not aReader.ReadFile(cadex.Base_UTF16String(theSource)):
+                print("Failed to read the file " + theSource)
+                return 1
+
+        # Making a model data
+        with aProfiler.Stage("transfer"):
+            if not aReader.Transfer(aModel):
+                print("Failed to transfer the model into inner format")
+                return 1
+
+        # Now we can get some model data
+        print(f"Model name: {aModel.Name()}")
+        print(f"Number of roots: {aModel.NumberOfRoots()}")
+
+        # Saving the cdx file
+        with aProfiler.Stage("write"):
+            if not cadex.ModelData_ModelWriter().Write(aModel, cadex.Base_UTF16String(theDest)):
+                print("Failed to save the .cdx file")
+                return 1
+
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
 
     print("Completed")
     return 0
@@ -0,0 +1,121 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+import cadexchanger.CadExCore as cadex
+
+
+# Triangles of a part in contiguous arrays: vertex coordinates (float32, N x 3) and vertex indices (uint32, M x 3)
+class MeshBuffers:
+    def __init__(self, theVertices: np.ndarray, theIndices: np.ndarray):
+        self.myVertices = theVertices
+        self.myIndices = theIndices
+
+    @staticmethod
+    def FromPoly(thePoly: cadex.ModelData_PolyRepresentation):
+        aTriangleSets = [cadex.ModelData_IndexedTriangleSet.Cast(aPVS) for aPVS in thePoly.Get()
+                         if aPVS.TypeId() == cadex.ModelData_IndexedTriangleSet.GetTypeId()]
+        aVertexCount = sum(anITS.NumberOfVertices() for anITS in aTriangleSets)
+        aTriangleCount = sum(anITS.NumberOfFaces() for anITS in aTriangleSets)
+
+        # Every triangle set is read once as its vertex array and its index array, indices are shifted
+        # by the number of vertices of the preceding sets. Vertices of different sets (e.g. B-Rep faces)
+        # are not merged, so normals and seams of the faces are preserved.
+        aVertices = np.empty((aVertexCount, 3), dtype=np.float32)
+        anIndices = np.empty((aTriangleCount, 3), dtype=np.uint32)
+        aVertexOffset = 0
+        aTriangleOffset = 0
+        for anITS in aTriangleSets:
+            aSetVertexCount = anITS.NumberOfVertices()
+            aSetTriangleCount = anITS.NumberOfFaces()
+            aPoints = (anITS.Coordinate(i) for i in range(aSetVertexCount))
+            aVertices[aVertexOffset:aVertexOffset + aSetVertexCount] = np.fromiter(
+                (c for p in aPoints for c in (p.X(), p.Y(), p.Z())),
+                dtype=np.float32, count=aSetVertexCount * 3).reshape(-1, 3)
+            anIndices[aTriangleOffset:aTriangleOffset + aSetTriangleCount] = np.fromiter(
+                (anITS.CoordinateIndex(i, j) for i in range(aSetTriangleCount) for j in range(3)),
+                dtype=np.uint32, count=aSetTriangleCount * 3).reshape(-1, 3) + aVertexOffset
+            aVertexOffset += aSetVertexCount
+            aTriangleOffset += aSetTriangleCount
+
+        return MeshBuffers(aVertices, anIndices)
+
+    def IsEmpty(self) -> bool:
+        return len(self.myIndices) == 0
+
+# Collects the mesh of every unique part and the placements (4 x 4 matrices relative to the scene graph root)
+# of all its occurrences. Parts without a polygonal representation are meshed from their B-Rep.
+class MeshCollector(cadex.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myMeshes = []
+        self.myNames = []
+        self.myInstances = []
+        self.myPartIndices = {}
+        self.myTransformationMatrix = [np.identity(4)]
+
+    def VisitPart(self, thePart: cadex.ModelData_Part):
+        anIndex = self.myPartIndices.get(thePart)
+        if anIndex is None:
+            aMesh = MeshCollector.__Mesh(thePart)
+            anIndex = len(self.myMeshes) if aMesh else -1
+            if aMesh:
+                self.myMeshes.append(aMesh)
+                self.myNames.append(str(thePart.Name()))
+            self.myPartIndices[thePart] = anIndex
+
+        if anIndex >= 0:
+            self.myInstances.append((anIndex, self.myTransformationMatrix[-1]))
+
+    def VisitEnterInstance(self, theInstance: cadex.ModelData_Instance) -> bool:
+        aMatrix = np.identity(4)
+        if theInstance.HasTransformation():
+            aTrsf = theInstance.Transformation()
+            aTranslation = aTrsf.TranslationPart()
+            aMatrix[:3, :3] = np.array(aTrsf.RotationPart()).reshape(3, 3)
+            aMatrix[:3, 3] = (aTranslation.X(), aTranslation.Y(), aTranslation.Z())
+        self.myTransformationMatrix.append(self.myTransformationMatrix[-1] @ aMatrix)
+        return True
+
+    def VisitLeaveInstance(self, theInstance: cadex.ModelData_Instance):
+        self.myTransformationMatrix.pop()
+
+    @staticmethod
+    def __Mesh(thePart: cadex.ModelData_Part):
+        aPoly = thePart.PolyRepresentation(cadex.ModelData_RM_Any)
+        if not aPoly:
+            aBRep = thePart.BRepRepresentation()
+            if not aBRep:
+                return None
+            aParam = cadex.ModelAlgo_BRepMesherParameters(cadex.ModelAlgo_BRepMesherParameters.Medium)
+            aPoly = cadex.ModelAlgo_BRepMesher(aParam).Compute(aBRep)
+
+        aMesh = MeshBuffers.FromPoly(aPoly)
+        return None if aMesh.IsEmpty() else aMesh
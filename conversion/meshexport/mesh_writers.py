@@ -0,0 +1,130 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import struct
+
+import numpy as np
+
+
+# Returns vertices of all the part occurrences placed into the scene and the matching vertex indices
+def FlattenInstances(theMeshes: list, theInstances: list):
+    aVertices = []
+    anIndices = []
+    anOffset = 0
+    for aMeshIndex, aMatrix in theInstances:
+        aMesh = theMeshes[aMeshIndex]
+        aVertices.append(aMesh.myVertices @ aMatrix[:3, :3].T.astype(np.float32) + aMatrix[:3, 3].astype(np.float32))
+        anIndices.append(aMesh.myIndices + np.uint32(anOffset))
+        anOffset += len(aMesh.myVertices)
+    if not aVertices:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.uint32)
+    return np.concatenate(aVertices), np.concatenate(anIndices)
+
+def WriteSTL(theMeshes: list, theInstances: list, theDest: str):
+    aVertices, anIndices = FlattenInstances(theMeshes, theInstances)
+    aTriangles = aVertices[anIndices]
+
+    aNormals = np.cross(aTriangles[:, 1] - aTriangles[:, 0], aTriangles[:, 2] - aTriangles[:, 0])
+    aLengths = np.linalg.norm(aNormals, axis=1, keepdims=True)
+    aNormals = np.divide(aNormals, aLengths, out=np.zeros_like(aNormals), where=aLengths > 0)
+
+    aRecords = np.zeros(len(aTriangles), dtype=[("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+    aRecords["normal"] = aNormals
+    aRecords["vertices"] = aTriangles
+
+    with open(theDest, "wb") as aFile:
+        aFile.write(b"Binary STL".ljust(80, b"\0"))
+        aFile.write(struct.pack("<I", len(aRecords)))
+        aRecords.tofile(aFile)
+
+def WritePLY(theMeshes: list, theInstances: list, theDest: str):
+    aVertices, anIndices = FlattenInstances(theMeshes, theInstances)
+
+    aFaces = np.empty(len(anIndices), dtype=[("count", "u1"), ("indices", "<u4", (3,))])
+    aFaces["count"] = 3
+    aFaces["indices"] = anIndices
+
+    aHeader = ("ply\n"
+               "format binary_little_endian 1.0\n"
+               f"element vertex {len(aVertices)}\n"
+               "property float x\n"
+               "property float y\n"
+               "property float z\n"
+               f"element face {len(aFaces)}\n"
+               "property list uchar uint vertex_indices\n"
+               "end_header\n")
+
+    with open(theDest, "wb") as aFile:
+        aFile.write(aHeader.encode("ascii"))
+        aVertices.astype("<f4").tofile(aFile)
+        aFaces.tofile(aFile)
+
+# Every unique part becomes a single glTF mesh, every occurrence of the part a node referring to it,
+# so instancing of the scene graph is preserved
+def WriteGLB(theMeshes: list, theNames: list, theInstances: list, theDest: str):
+    aBuffer = bytearray()
+    aGLTF = {"asset": {"version": "2.0"}, "scene": 0, "scenes": [{"nodes": [0]}],
+             "nodes": [], "meshes": [], "accessors": [], "bufferViews": []}
+
+    def AddBufferView(theData: bytes, theTarget: int) -> int:
+        aBuffer.extend(theData)
+        aGLTF["bufferViews"].append({"buffer": 0, "byteOffset": len(aBuffer) - len(theData),
+                                     "byteLength": len(theData), "target": theTarget})
+        aBuffer.extend(b"\0" * (-len(aBuffer) % 4))
+        return len(aGLTF["bufferViews"]) - 1
+
+    for aMesh, aName in zip(theMeshes, theNames):
+        aPositionView = AddBufferView(aMesh.myVertices.astype("<f4").tobytes(), 34962)
+        anIndexView = AddBufferView(aMesh.myIndices.astype("<u4").tobytes(), 34963)
+        aGLTF["accessors"].append({"bufferView": aPositionView, "componentType": 5126, "count": len(aMesh.myVertices),
+                                   "type": "VEC3", "min": aMesh.myVertices.min(axis=0).tolist(),
+                                   "max": aMesh.myVertices.max(axis=0).tolist()})
+        aGLTF["accessors"].append({"bufferView": anIndexView, "componentType": 5125, "count": aMesh.myIndices.size,
+                                   "type": "SCALAR"})
+        aGLTF["meshes"].append({"name": aName, "primitives": [{"attributes": {"POSITION": len(aGLTF["accessors"]) - 2},
+                                                               "indices": len(aGLTF["accessors"]) - 1}]})
+
+    # Model coordinates are in millimeters while glTF uses meters
+    aGLTF["nodes"].append({"name": "root", "scale": [0.001, 0.001, 0.001],
+                           "children": list(range(1, len(theInstances) + 1))})
+    for aMeshIndex, aMatrix in theInstances:
+        aGLTF["nodes"].append({"mesh": aMeshIndex, "matrix": aMatrix.T.flatten().tolist()})
+
+    aGLTF["buffers"] = [{"byteLength": len(aBuffer)}]
+
+    aJSON = json.dumps(aGLTF, separators=(",", ":")).encode()
+    aJSON += b" " * (-len(aJSON) % 4)
+
+    with open(theDest, "wb") as aFile:
+        aFile.write(struct.pack("<III", 0x46546C67, 2, 12 + 8 + len(aJSON) + 8 + len(aBuffer)))
+        aFile.write(struct.pack("<II", len(aJSON), 0x4E4F534A))
+        aFile.write(aJSON)
+        aFile.write(struct.pack("<II", len(aBuffer), 0x004E4942))
+        aFile.write(aBuffer)
@@ -0,0 +1,164 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import sys
+from pathlib import Path
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from conversion_parameters import ConversionParameters
+from model_flusher import ModelFlusher
+
+
+# Writers of these formats may mesh the B-Rep, i.e. modify the model they write
+MESHING_EXTENSIONS = {".cdxweb", ".jt", ".stl", ".obj", ".gltf", ".glb", ".ply", ".wrl", ".x3d",
+                      ".fbx", ".3ds", ".dae", ".3mf", ".usd", ".usdz"}
+
+def IsMeshingWriter(theDest: str) -> bool:
+    return os.path.splitext(theDest)[1].lower() in MESHING_EXTENSIONS
+
+# The same parameters as in the cdxwebconverter example
+def CDXWEBParameters() -> cadex.ModelData_WriterParameters:
+    aParams = cadex.ModelData_WriterParameters()
+    aParams.SetFileFormat(cadex.ModelData_WriterParameters.CDXWEB)
+    aParams.SetWriteBRepRepresentation(True)
+    aParams.SetWritePolyRepresentation(True)
+    aParams.SetPreferredLOD(cadex.ModelData_RM_MediumLOD)
+    aParams.SetWriteTextures(False)
+    aParams.SetWritePMI(False)
+    return aParams
+
+def WriteModel(theModel: cadex.ModelData_Model, theDest: str, theParams: ConversionParameters):
+    aStartTime = time.perf_counter()
+    anIsOK = False
+    aMessage = ""
+
+    aWriter = cadex.ModelData_ModelWriter()
+    if theDest.lower().endswith(".cdxweb"):
+        aWriter.SetWriterParameters(CDXWEBParameters())
+    theParams.ApplyTo(None, aWriter)
+
+    os.makedirs(os.path.dirname(theDest), exist_ok=True)
+    try:
+        anIsOK = aWriter.Write(theModel, cadex.Base_UTF16String(theDest))
+        if not anIsOK:
+            aMessage = "Failed to convert and write the file to specified format " + theDest
+    except cadex.Base_Exception as anEx:
+        aMessage = str(anEx.What())
+
+    return anIsOK, time.perf_counter() - aStartTime, aMessage
+
+# theParams are the reader parameters and the writer parameters of all the targets, theTargetParams (if given)
+# maps a destination to its own writer parameters, which are used for that target instead of theParams
+def main(theSource: str, theDests: list, theParams: ConversionParameters = None, theIsParallel: bool = True,
+         theTargetParams: dict = None):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aParams = theParams if theParams else ConversionParameters()
+    aTargetParams = {aDest: theTargetParams.get(aDest, aParams) if theTargetParams else aParams for aDest in theDests}
+
+    aModel = cadex.ModelData_Model()
+
+    print("Conversion started...")
+    aStartTime = time.perf_counter()
+
+    # The model is read only once for all the targets
+    aReader = cadex.ModelData_ModelReader()
+    aParams.ApplyTo(aReader, None)
+    if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+        print("Failed to open and convert the file " + theSource)
+        return 1
+
+    print(f"Read {theSource} in {time.perf_counter() - aStartTime:.2f} s")
+
+    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+
+    aResults = {}
+    if theIsParallel and len(theDests) > 1:
+        # Writers that mesh the B-Rep modify the model, so they run one after another first.
+        # The remaining writers only read the already converted model data and run in parallel.
+        aModel.AcceptElementVisitor(ModelFlusher())
+        for aDest in theDests:
+            if IsMeshingWriter(aDest):
+                aResults[aDest] = WriteModel(aModel, aDest, aTargetParams[aDest])
+        aReadOnlyDests = [aDest for aDest in theDests if not IsMeshingWriter(aDest)]
+        if aReadOnlyDests:
+            with ThreadPoolExecutor(max_workers=len(aReadOnlyDests)) as anExecutor:
+                for aDest, aResult in zip(aReadOnlyDests, anExecutor.map(lambda theDest: WriteModel(aModel, theDest, aTargetParams[theDest]),
+                                                                         aReadOnlyDests)):
+                    aResults[aDest] = aResult
+    else:
+        for aDest in theDests:
+            aResults[aDest] = WriteModel(aModel, aDest, aTargetParams[aDest])
+
+    aRes = 0
+    for aDest in theDests:
+        anIsOK, aTime, aMessage = aResults[aDest]
+        if anIsOK:
+            print(f"Wrote {aDest} in {aTime:.2f} s")
+        else:
+            print(aMessage)
+            aRes = 1
+
+    print(f"Total time: {time.perf_counter() - aStartTime:.2f} s")
+
+    print("Completed")
+    return aRes
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Reads a file once and writes it to several formats.")
+    aParser.add_argument("input", help="file to be read")
+    aParser.add_argument("outputs", nargs="+", help="files to write the model to, the format is defined by the file extension")
+    aParser.add_argument("--params", default="", help="JSON file with reader parameters and writer parameters of all the outputs")
+    aParser.add_argument("--target-params", nargs=2, action="append", default=[], metavar=("OUTPUT", "PARAMS"),
+                         help="JSON file with writer parameters of one of the outputs, used instead of --params for it")
+    anArgs = aParser.parse_args()
+
+    aSource = os.path.abspath(anArgs.input)
+    aDests = [os.path.abspath(aDest) for aDest in anArgs.outputs]
+    aParams = ConversionParameters.FromFile(anArgs.params) if anArgs.params else ConversionParameters()
+    aTargetParams = {os.path.abspath(aDest): ConversionParameters.FromFile(aPath) for aDest, aPath in anArgs.target_params}
+    for aDest in aTargetParams:
+        if aDest not in aDests:
+            aParser.error("--target-params output is not in the outputs: " + aDest)
+
+    sys.exit(main(aSource, aDests, aParams, True, aTargetParams))
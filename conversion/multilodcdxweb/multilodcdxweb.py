@@ -0,0 +1,113 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from lod_mesher import LODMesher
+from stage_profiler import StageProfiler
+
+
+def main(theSource: str, theDest: str):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aReader = cadex.ModelData_ModelReader()
+
+    aModel = cadex.ModelData_Model()
+
+    # Records time and memory of every stage if CADEX_PROFILE environment variable is set
+    aProfiler = StageProfiler(theDest)
+
+    anIsOK = False
+    try:
+        # Opening and converting the file
+        with aProfiler.Stage("read"):
+            if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+                print("Failed to read the file " + theSource)
+                return 1
+
+        cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        try:
+            # Coarse, medium and fine meshes of all the parts are computed in one pass
+            aStartTime = time.perf_counter()
+            with aProfiler.Stage("meshing"):
+                aMeshCount = LODMesher().Compute(aModel)
+            print(f"Computed {aMeshCount} meshes in {time.perf_counter() - aStartTime:.2f} s")
+
+            # Saving the CDXWEB file with all the LODs, so a viewer can load the coarse ones first
+            aWriter = cadex.ModelData_ModelWriter()
+            aParams = cadex.ModelData_WriterParameters()
+            aParams.SetFileFormat(cadex.ModelData_WriterParameters.CDXWEB)
+            aParams.SetWriteBRepRepresentation(True)
+            aParams.SetWritePolyRepresentation(True)
+            aParams.SetPreferredLOD(cadex.ModelData_RM_Any)
+            aParams.SetWriteTextures(False)
+            aParams.SetWritePMI(False)
+
+            aWriter.SetWriterParameters(aParams)
+
+            with aProfiler.Stage("write"):
+                if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
+                    print("Failed to save the .cdxweb file ", theDest)
+                    return 1
+        except cadex.Base_Exception as anEx:
+            print(anEx.What())
+            return 1
+
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <output_file>, where:")
+        print("    <input_file>  is a name of the file to be read")
+        print("    <output_file> is a name of the CDXWEB file to Save() the model")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aDest = os.path.abspath(sys.argv[2])
+
+    sys.exit(main(aSource, aDest))
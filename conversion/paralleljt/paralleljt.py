@@ -0,0 +1,121 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from assembly_split import AssemblyUnitCollector, AssemblyUnitJob, AssemblyUnitWriter, UnitFileName, WriteManifest
+from conversion_parameters import ConversionParameters
+from structure_import import ReadStructure
+
+
+# Every unique part is written to its own JT file at the origin, and the parts are distributed among worker processes
+# instead of being written one by one. Unlike JT_WriterParameters.PerPart, no top-level JT assembly is written:
+# the writer can only write the parts it converts itself, so the product structure (the placements of every part)
+# is written to a JSON manifest instead.
+# theMemoryLimit (in bytes) is the resident memory size above which a worker releases the model it keeps for
+# the next parts. Parts are many and small, so re-reading the file for every part would dominate the conversion
+# time, hence the scene graph is kept by default unless a worker grows above the limit.
+def main(theSource: str, theOutputDir: str, theWorkerCount: int = 0, theParams: ConversionParameters = None,
+         theMemoryLimit: int = 2048 * 1024 * 1024):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+    if not ReadStructure(theSource, aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    # A negative level makes every unique part a separate unit
+    aCollector = AssemblyUnitCollector(-1)
+    aModel.AcceptElementVisitor(aCollector)
+    aParts = aCollector.myUnits
+
+    del aCollector
+    del aModel
+
+    if not aParts:
+        print("No parts found in " + theSource)
+        return 1
+
+    aParams = theParams if theParams else ConversionParameters()
+    aJobs = [AssemblyUnitJob(theSource, os.path.join(theOutputDir, UnitFileName(aPart, "jt")), aParams, -1, aPart.myIndex)
+             for aPart in aParts]
+
+    aWorkerCount = min(theWorkerCount if theWorkerCount > 0 else os.cpu_count(), len(aJobs))
+    print(f"Writing {len(aJobs)} unique parts with {aWorkerCount} worker processes...")
+
+    aFailedCount = 0
+    aStartTime = time.perf_counter()
+
+    # Workers are kept alive, so every worker reads the scene graph once and then writes many parts,
+    # until it exceeds the memory limit and reads the scene graph again for the next part
+    with multiprocessing.Pool(aWorkerCount, initializer=AssemblyUnitWriter.Initialize, initargs=(theMemoryLimit,)) as aPool:
+        for aResult in aPool.imap_unordered(AssemblyUnitWriter.Write, aJobs):
+            if not aResult.myIsOK:
+                aFailedCount += 1
+                print(f"FAILED {os.path.basename(aResult.myDest)}: {aResult.myMessage}")
+
+    aManifestPath = WriteManifest(theSource, theOutputDir, aParts, "jt")
+
+    print(f"Parts written: {len(aJobs) - aFailedCount} of {len(aJobs)} in {time.perf_counter() - aStartTime:.2f} s")
+    print(f"Manifest:      {aManifestPath}")
+
+    print("Completed")
+    return 0 if aFailedCount == 0 else 1
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Writes every unique part of a model to its own JT file in parallel, "
+                                                  "with the placements of the parts in a JSON manifest.")
+    aParser.add_argument("input", help="file to be converted")
+    aParser.add_argument("output_dir", help="directory to write the JT files and the manifest to")
+    aParser.add_argument("--workers", type=int, default=0, help="number of worker processes (default: number of CPUs)")
+    aParser.add_argument("--params", default="", help="JSON file with JT writer parameters")
+    aParser.add_argument("--memory-limit", type=int, default=2048,
+                         help="worker memory in megabytes above which the model is released and read again (default: 2048)")
+    anArgs = aParser.parse_args()
+
+    aParams = ConversionParameters.FromFile(anArgs.params) if anArgs.params else ConversionParameters()
+
+    sys.exit(main(os.path.abspath(anArgs.input), os.path.abspath(anArgs.output_dir), anArgs.workers, aParams,
+                  anArgs.memory_limit * 1024 * 1024))
@@ -0,0 +1,162 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from conversion_parameters import ConversionParameters
+from conversion_watchdog import ConversionWatchdog
+from conversion_worker import ConversionJob
+from spool_queue import SpoolQueue
+
+
+def Submit(theSpoolDir: str, theFiles: list, theOutputDir: str, theFormat: str = "jt",
+           theParams: ConversionParameters = None):
+    aQueue = SpoolQueue(theSpoolDir)
+    for aSource in theFiles:
+        aDest = os.path.join(theOutputDir, Path(aSource).stem + "." + theFormat)
+        aJobId = aQueue.Submit(ConversionJob(aSource, aDest, theParams))
+        print(f"Submitted {aJobId} {aSource}")
+
+# Pulls jobs from the queue until it is stopped or, if theIsExitingWhenIdle is set, until there are
+# no pending and claimed jobs left. Every job is converted in a child process (see ConversionWatchdog),
+# so the worker keeps sending heartbeats however long the conversion takes.
+def Work(theSpoolDir: str, theLeaseTime: float = 60.0, theIsExitingWhenIdle: bool = False, theTimeout: float = 0.0):
+    aQueue = SpoolQueue(theSpoolDir)
+    aWatchdog = ConversionWatchdog(theTimeout)
+
+    with ThreadPoolExecutor(max_workers=1) as anExecutor:
+        while True:
+            aReapedCount = aQueue.Reap(theLeaseTime)
+            if aReapedCount:
+                print(f"[{aQueue.myWorkerId}] Returned {aReapedCount} jobs with expired leases to the queue")
+
+            aFileName, aJob = aQueue.Claim()
+            if aFileName is None:
+                if theIsExitingWhenIdle and aQueue.Counts()["claimed"] == 0:
+                    break
+                time.sleep(1.0)
+                continue
+
+            # If the lease is lost (e.g. the job was reaped while this host was unreachable), another worker
+            # may already be converting the job, so the conversion is aborted and its result is dropped
+            aCancelEvent = threading.Event()
+            aFuture = anExecutor.submit(aWatchdog.Convert, aJob, aCancelEvent)
+            while wait([aFuture], timeout=theLeaseTime / 4).not_done:
+                if not aQueue.Heartbeat(aFileName):
+                    aCancelEvent.set()
+
+            aResult = aFuture.result()
+            if aCancelEvent.is_set():
+                print(f"[{aQueue.myWorkerId}] Lost the lease, aborted {aResult.mySource}")
+                continue
+            aQueue.Complete(aFileName, aResult)
+
+            aStatus = "OK" if aResult.myIsOK else "FAILED"
+            print(f"[{aQueue.myWorkerId}] {aStatus} {aResult.myWallTime:8.2f} s  {aResult.mySource}")
+            if not aResult.myIsOK:
+                print("    " + aResult.myMessage)
+
+def PrintStatus(theSpoolDir: str):
+    aQueue = SpoolQueue(theSpoolDir)
+    aCounts = aQueue.Counts()
+    print("Jobs: " + ", ".join(f"{aCount} {aState}" for aState, aCount in aCounts.items()))
+
+    aWorkers = {}
+    for aRecord in aQueue.Journal():
+        aWorkers[aRecord["worker"]] = aWorkers.get(aRecord["worker"], 0) + 1
+    for aWorker, aCount in sorted(aWorkers.items()):
+        print(f"    {aWorker}: {aCount} jobs finished")
+
+# Runs the whole farm on the local machine: submits the files and starts several worker processes
+def main(theSpoolDir: str, theFiles: list, theOutputDir: str, theWorkerCount: int = 2):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    Submit(theSpoolDir, theFiles, theOutputDir)
+
+    aWorkers = [multiprocessing.Process(target=Work, args=(theSpoolDir, 60.0, True)) for i in range(theWorkerCount)]
+    for aWorker in aWorkers:
+        aWorker.start()
+    for aWorker in aWorkers:
+        aWorker.join()
+
+    PrintStatus(theSpoolDir)
+
+    print("Completed")
+    return 0 if SpoolQueue(theSpoolDir).Counts()["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Converts files using a job queue kept in a shared directory.")
+    aCommands = aParser.add_subparsers(dest="command", required=True)
+
+    aSubmitParser = aCommands.add_parser("submit", help="add conversion jobs to the queue")
+    aSubmitParser.add_argument("spool_dir", help="directory of the queue")
+    aSubmitParser.add_argument("output_dir", help="directory to write the converted files to")
+    aSubmitParser.add_argument("files", nargs="+", help="files to be converted")
+    aSubmitParser.add_argument("--format", default="jt", help="extension of the target format (default: jt)")
+    aSubmitParser.add_argument("--params", default="", help="JSON file with reader and writer parameters")
+
+    aWorkParser = aCommands.add_parser("work", help="convert jobs from the queue")
+    aWorkParser.add_argument("spool_dir", help="directory of the queue")
+    aWorkParser.add_argument("--lease", type=float, default=60.0, help="lease time of a claimed job in seconds (default: 60)")
+    aWorkParser.add_argument("--timeout", type=float, default=0, help="kill conversions running longer, in seconds")
+    aWorkParser.add_argument("--exit-when-idle", action="store_true", help="exit when there are no jobs left")
+
+    aStatusParser = aCommands.add_parser("status", help="print the number of jobs in every state")
+    aStatusParser.add_argument("spool_dir", help="directory of the queue")
+
+    anArgs = aParser.parse_args()
+    aSpoolDir = os.path.abspath(anArgs.spool_dir)
+
+    if anArgs.command == "submit":
+        aParams = ConversionParameters.FromFile(anArgs.params) if anArgs.params else ConversionParameters()
+        Submit(aSpoolDir, [os.path.abspath(aFile) for aFile in anArgs.files], os.path.abspath(anArgs.output_dir),
+               anArgs.format, aParams)
+    elif anArgs.command == "work":
+        Work(aSpoolDir, anArgs.lease, anArgs.exit_when_idle, anArgs.timeout)
+    else:
+        PrintStatus(aSpoolDir)
+    sys.exit(0)
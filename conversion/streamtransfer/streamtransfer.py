@@ -0,0 +1,135 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from assembly_split import AssemblyUnitCollector, AssemblyUnitJob, AssemblyUnitWriter, UnitFileName, WriteManifest
+from conversion_parameters import ConversionParameters
+from format_registry import FormatRegistry
+from process_memory import PeakRSS
+from structure_import import ReadStructure
+
+
+# theMemoryLimit (in bytes) is the resident memory size above which a worker releases the converted
+# geometry and reads the scene graph again, 0 means every unit is written by a new worker process
+def main(theSource: str, theOutputDir: str, theFormat: str = "jt", theLevel: int = 1, theWorkerCount: int = 1,
+         theParams: ConversionParameters = None, theMemoryLimit: int = 0):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aFormat = FormatRegistry.Sniff(theSource)
+    if aFormat is None or aFormat.Module() is None:
+        print("Warning: delayed conversion is not available for " + theSource + ", every unit will read the whole model")
+
+    aModel = cadex.ModelData_Model()
+    if not ReadStructure(theSource, aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    aCollector = AssemblyUnitCollector(theLevel)
+    aModel.AcceptElementVisitor(aCollector)
+    aUnits = aCollector.myUnits
+
+    # Only the unit list is needed from now on, the structure is released before any geometry is converted
+    del aCollector
+    del aModel
+
+    if not aUnits:
+        print("No parts or assemblies found in " + theSource)
+        return 1
+
+    aParams = theParams if theParams else ConversionParameters()
+    aJobs = []
+    for aUnit in aUnits:
+        aDest = os.path.join(theOutputDir, UnitFileName(aUnit, theFormat))
+        aJobs.append(AssemblyUnitJob(theSource, aDest, aParams, theLevel, aUnit.myIndex))
+
+    aWorkerCount = min(theWorkerCount if theWorkerCount > 0 else os.cpu_count(), len(aJobs))
+    print(f"Writing {len(aJobs)} units with {aWorkerCount} worker processes...")
+
+    aResults = []
+    aStartTime = time.perf_counter()
+
+    # Workers convert geometry of the units they write only. Without a memory limit every worker process
+    # writes a single unit and exits, so the memory of its geometry is returned to the system and the peak
+    # memory usage of a worker is bounded by the largest unit, not by the whole product. With a memory limit
+    # workers are kept and read the scene graph again only after exceeding the limit.
+    aTasksPerChild = None if theMemoryLimit > 0 else 1
+    with multiprocessing.Pool(aWorkerCount, initializer=AssemblyUnitWriter.Initialize, initargs=(theMemoryLimit,),
+                              maxtasksperchild=aTasksPerChild) as aPool:
+        for aResult in aPool.imap_unordered(AssemblyUnitWriter.Write, aJobs):
+            aResults.append(aResult)
+            aStatus = "OK" if aResult.myIsOK else "FAILED"
+            print(f"[{len(aResults)}/{len(aJobs)}] {aStatus} {aResult.myWallTime:8.2f} s "
+                  f"{aResult.myPeakRSS / (1024 * 1024):8.1f} MB  {os.path.basename(aResult.myDest)}")
+            if not aResult.myIsOK:
+                print("    " + aResult.myMessage)
+
+    aManifestPath = WriteManifest(theSource, theOutputDir, aUnits, theFormat)
+
+    print()
+    print(f"Total time:      {time.perf_counter() - aStartTime:.2f} s")
+    print(f"Peak RSS:        {max(r.myPeakRSS for r in aResults) / (1024 * 1024):.1f} MB per worker, "
+          f"{PeakRSS() / (1024 * 1024):.1f} MB in the main process")
+    print(f"Manifest:        {aManifestPath}")
+
+    print("Completed")
+    return 0 if all(r.myIsOK for r in aResults) else 1
+
+if __name__ == "__main__":
+    aParser = argparse.ArgumentParser(description="Converts a large assembly subassembly by subassembly with bounded memory usage.")
+    aParser.add_argument("input", help="file to be converted")
+    aParser.add_argument("output_dir", help="directory to write the converted subassemblies and the manifest to")
+    aParser.add_argument("--format", default="jt", help="extension of the target format (default: jt)")
+    aParser.add_argument("--level", type=int, default=1, help="nesting level of the written subassemblies, negative for parts only (default: 1)")
+    aParser.add_argument("--workers", type=int, default=1, help="number of worker processes (default: 1)")
+    aParser.add_argument("--params", default="", help="JSON file with writer parameters")
+    aParser.add_argument("--memory-limit", type=int, default=0,
+                         help="worker memory in megabytes above which converted geometry is released (default: a new worker for every unit)")
+    anArgs = aParser.parse_args()
+
+    aParams = ConversionParameters.FromFile(anArgs.params) if anArgs.params else ConversionParameters()
+
+    sys.exit(main(os.path.abspath(anArgs.input), os.path.abspath(anArgs.output_dir), anArgs.format, anArgs.level,
+                  anArgs.workers, aParams, anArgs.memory_limit * 1024 * 1024))
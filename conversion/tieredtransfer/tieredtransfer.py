@@ -0,0 +1,147 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
+import cadex_license as license
+
+from lod_mesher import LODMesher
+from stage_profiler import StageProfiler
+from structure_import import ReadStructure
+
+
+# Coarse meshes only, no B-Rep, PMI or textures, so that the preview is small and quick to write and to load
+def PreviewParameters() -> cadex.ModelData_WriterParameters:
+    aParams = cadex.ModelData_WriterParameters()
+    aParams.SetFileFormat(cadex.ModelData_WriterParameters.CDXWEB)
+    aParams.SetWriteBRepRepresentation(False)
+    aParams.SetWritePolyRepresentation(True)
+    aParams.SetPreferredLOD(cadex.ModelData_RM_CoarseLOD)
+    aParams.SetWriteTextures(False)
+    aParams.SetWritePMI(False)
+    return aParams
+
+# Writes "<theDest>.ready" when a tier is complete, a UI may poll for it instead of passing a callback
+def WriteMarker(theTier: str, theDest: str, theElapsedTime: float):
+    with open(theDest + ".ready.tmp", "w") as aFile:
+        json.dump({"tier": theTier, "path": theDest, "elapsed": theElapsedTime}, aFile)
+    os.replace(theDest + ".ready.tmp", theDest + ".ready")
+
+def WriteTier(theModel: cadex.ModelData_Model, theDest: str, theParams: cadex.ModelData_WriterParameters = None) -> bool:
+    aWriter = cadex.ModelData_ModelWriter()
+    if theParams:
+        aWriter.SetWriterParameters(theParams)
+    os.makedirs(os.path.dirname(theDest), exist_ok=True)
+    return aWriter.Write(theModel, cadex.Base_UTF16String(theDest))
+
+# theCallback (if given) is called as theCallback(theTier, theDest, theElapsedTime) when a tier is complete
+def main(theSource: str, thePreviewDest: str, theDest: str, theCallback = None):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aStartTime = time.perf_counter()
+    aProfiler = StageProfiler(theDest)
+
+    anIsOK = False
+    try:
+        aModel = cadex.ModelData_Model()
+
+        # Geometry is converted on first access, i.e. by the mesher
+        with aProfiler.Stage("read"):
+            if not ReadStructure(theSource, aModel):
+                print("Failed to read the file " + theSource)
+                return 1
+
+        cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        try:
+            # Tier 1: coarse preview. Meshes embedded in the file are used as they are, other parts are meshed
+            # as soon as their B-Rep is converted
+            aPreviewMesher = LODMesher(["coarse"], theIsEmbeddedMeshReused=True)
+            with aProfiler.Stage("preview"):
+                aPreviewMesher.Compute(aModel)
+                if not WriteTier(aModel, thePreviewDest, PreviewParameters()):
+                    print("Failed to write the preview " + thePreviewDest)
+                    return 1
+
+                # The preview meshes must not get into the full fidelity file
+                aPreviewMesher.RemoveAdded()
+
+            anElapsedTime = time.perf_counter() - aStartTime
+            WriteMarker("preview", thePreviewDest, anElapsedTime)
+            if theCallback:
+                theCallback("preview", thePreviewDest, anElapsedTime)
+            print(f"Preview is ready in {anElapsedTime:.2f} s: {thePreviewDest}")
+
+            # Tier 2: full fidelity B-Rep conversion
+            with aProfiler.Stage("full"):
+                if not WriteTier(aModel, theDest):
+                    print("Failed to convert and write the file to specified format " + theDest)
+                    return 1
+
+            anElapsedTime = time.perf_counter() - aStartTime
+            WriteMarker("full", theDest, anElapsedTime)
+            if theCallback:
+                theCallback("full", theDest, anElapsedTime)
+            print(f"Full conversion is ready in {anElapsedTime:.2f} s: {theDest}")
+        except cadex.Base_Exception as anEx:
+            print(anEx.What())
+            return 1
+
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file> <preview_file> <output_file>, where:")
+        print("    <input_file>   is a name of the file to be read")
+        print("    <preview_file> is a name of the CDXWEB file to write the coarse preview to")
+        print("    <output_file>  is a name of the file to Save() the model, the format is defined by the file extension")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+    aPreviewDest = os.path.abspath(sys.argv[2])
+    aDest = os.path.abspath(sys.argv[3])
+
+    sys.exit(main(aSource, aPreviewDest, aDest))
@@ -34,8 +34,11 @@ import os
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
 import cadex_license as license
 
+from stage_profiler import StageProfiler
+
 
 def main(theSource: str, theDest: str):
     aKey = license.Value()
@@ -46,24 +49,36 @@ def main(theSource: str, theDest: str):
 
     aModel = cadex.ModelData_Model()
 
-    print("Conversion started...")
-
-    aReader = cadex.ModelData_ModelReader()
-    # Opening and converting the file
-    if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
-        print("Failed to open and convert the file " + theSource)
-        return 1
+    # Records time and memory of every stage if CADEX_PROFILE environment variable is set
+    aProfiler = StageProfiler(theDest)
 
-    cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+    anIsOK = False
     try:
-        aWriter = cadex.ModelData_ModelWriter()
-        # Converting and writing the model to file
-        if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
-            print("Failed to convert and write the file to specified format " + theDest)
+        print("Conversion started...")
+
+        aReader = cadex.ModelData_ModelReader()
+        # Opening and converting the file
+        with aProfiler.Stage("read"):
+            if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
+                print("Failed to open and convert the file " + theSource)
+                return 1
+
+        cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
+        try:
+            aWriter = cadex.ModelData_ModelWriter()
+            # Converting and writing the model to file
+            with aProfiler.Stage("write"):
+                if not aWriter.Write(aModel, cadex.Base_UTF16String(theDest)):
+                    print("Failed to convert and write the file to specified format " + theDest)
+                    return 1
+        except cadex.Base_Exception as anEx:
+            print(anEx.What())
             return 1
-    except cadex.Base_Exception as anEx:
-        print(anEx.What())
-        return 1
+
+        anIsOK = True
+    finally:
+        # The profile is written on failure too, the stages done so far are already saved as they end
+        aProfiler.Write(theIsOK=anIsOK)
 
     print("Completed")
     return 0
@@ -38,11 +38,57 @@ import os
 import cadexchanger.CadExCore as cadex
 
 sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../helpers/"))
 import cadex_license as license
-import cadexchanger.CadExSTEP as step
-import cadexchanger.CadExJT as jt
-import cadexchanger.CadExOBJ as obj
 
+from format_registry import FormatRegistry
+
+
+# Format specific modules are imported only when the corresponding format is actually read or written,
+# so converting e.g. a STEP file does not load the JT and OBJ modules at all
+def SetSTEPReaderParameters(theReader: cadex.ModelData_ModelReader):
+    import cadexchanger.CadExSTEP as step
+
+    aSTEPReaderParams = step.STEP_ReaderParameters()
+    aSTEPReaderParams.SetPreferredBRepRepresentationType(step.STEP_ReaderParameters.AdvancedBRep)
+    theReader.SetReaderParameters(aSTEPReaderParams)
+
+def SetJTReaderParameters(theReader: cadex.ModelData_ModelReader):
+    import cadexchanger.CadExJT as jt
+
+    aJTReaderParams = jt.JT_ReaderParameters()
+    aJTReaderParams.SetLayerConversionMode(jt.JT_ReaderParameters.LayerFilter)
+    theReader.SetReaderParameters(aJTReaderParams)
+
+def SetOBJWriterParameters(theWriter: cadex.ModelData_ModelWriter):
+    import cadexchanger.CadExOBJ as obj
+
+    anOBJParams = obj.OBJ_WriterParameters()
+    # Set some writer parameters
+    anOBJParams.SetLengthUnit(cadex.Base_LU_Centimeters)
+    anOBJParams.SetToGenerateMtlFile(True)
+    theWriter.SetWriterParameters(anOBJParams)
+
+def SetJTWriterParameters(theWriter: cadex.ModelData_ModelWriter):
+    import cadexchanger.CadExJT as jt
+
+    aJTParams = jt.JT_WriterParameters()
+    aJTParams.SetFileSplitMode(jt.JT_WriterParameters.PerPart)
+    theWriter.SetWriterParameters(aJTParams)
+
+# The input format is identified by the file contents
+def SetReaderParameters(theReader: cadex.ModelData_ModelReader, theSource: str):
+    aSetters = {"STEP": SetSTEPReaderParameters, "JT": SetJTReaderParameters}
+    aFormat = FormatRegistry.Sniff(theSource)
+    if aFormat is not None and aFormat.myName in aSetters:
+        aSetters[aFormat.myName](theReader)
+
+# The output format is identified by the file extension
+def SetWriterParameters(theWriter: cadex.ModelData_ModelWriter, theDest: str):
+    aSetters = {".obj": SetOBJWriterParameters, ".jt": SetJTWriterParameters}
+    anExtension = os.path.splitext(theDest)[1].lower()
+    if anExtension in aSetters:
+        aSetters[anExtension](theWriter)
 
 def main(theSource: str, theDest: str):
     aKey = license.Value()
@@ -57,14 +103,8 @@ def main(theSource: str, theDest: str):
 
     aReader = cadex.ModelData_ModelReader()
 
-    # Let's set new parameters
-    aSTEPReaderParams = step.STEP_ReaderParameters()
-    aSTEPReaderParams.SetPreferredBRepRepresentationType(step.STEP_ReaderParameters.AdvancedBRep)
-    aReader.SetReaderParameters(aSTEPReaderParams)
-
-    aJTReaderParams = jt.JT_ReaderParameters()
-    aJTReaderParams.SetLayerConversionMode(jt.JT_ReaderParameters.LayerFilter)
-    aReader.SetReaderParameters(aJTReaderParams)
+    # Let's set new parameters for the format of the input file
+    SetReaderParameters(aReader, theSource)
 
     # Opening and converting the file
     if not aReader.Read(cadex.Base_UTF16String(theSource), aModel):
@@ -73,15 +113,8 @@ def main(theSource: str, theDest: str):
 
     aWriter = cadex.ModelData_ModelWriter()
 
-    anOBJParams = obj.OBJ_WriterParameters()
-    # Set some writer parameters
-    anOBJParams.SetLengthUnit(cadex.Base_LU_Centimeters)
-    anOBJParams.SetToGenerateMtlFile(True)
-    aWriter.SetWriterParameters(anOBJParams)
-
-    aJTParams = jt.JT_WriterParameters()
-    aJTParams.SetFileSplitMode(jt.JT_WriterParameters.PerPart)
-    aWriter.SetWriterParameters(aJTParams)
+    # And the parameters of the output format
+    SetWriterParameters(aWriter, theDest)
 
     cadex.Base_Settings.Default().SetValue(cadex.Base_Settings.UseExceptions, True)
     try:
@@ -0,0 +1,101 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+from pathlib import Path
+import os
+import time
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../"))
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + r"/../../conversion/helpers/"))
+import cadex_license as license
+
+from structure_import import ReadStructure, StructureVisitor
+
+
+def PrintTree(theNodes: list, theNestingLevel: int = 0):
+    for aNode in theNodes:
+        aName = aNode.myName if aNode.myName else "noname"
+        print("--- " * theNestingLevel + f"{aNode.myType}: {aName}")
+        for aPropName, aPropValue in aNode.myProperties.items():
+            print("    " * (theNestingLevel + 1) + f"{aPropName}: {aPropValue}")
+        PrintTree(aNode.myChildren, theNestingLevel + 1)
+
+def PrintCounts(theOccurrences: dict):
+    aRows = []
+    for anSGE, aCount in theOccurrences.items():
+        if anSGE.TypeId() == cadex.ModelData_Part.GetTypeId():
+            aRows.append((str(anSGE.Name()), "Part", aCount))
+        elif anSGE.TypeId() == cadex.ModelData_Assembly.GetTypeId():
+            aRows.append((str(anSGE.Name()), "Assembly", aCount))
+
+    aMargin = max([len(aRow[0]) for aRow in aRows] + [len("name")])
+    print("Total:")
+    print("\t" + "name".ljust(aMargin) + " | " + "type".ljust(8) + " | count")
+    for aName, aType, aCount in aRows:
+        print("\t" + aName.ljust(aMargin) + " | " + aType.ljust(8) + " | " + str(aCount))
+
+def main(theSource: str):
+    aKey = license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+
+    aModel = cadex.ModelData_Model()
+
+    aStartTime = time.perf_counter()
+
+    # Only the scene graph is built, geometry stays unconverted
+    if not ReadStructure(theSource, aModel):
+        print("Failed to read the file " + theSource)
+        return 1
+
+    aVisitor = StructureVisitor()
+    aModel.AcceptElementVisitor(aVisitor)
+
+    PrintTree(aVisitor.myRoots)
+    PrintCounts(aVisitor.myOccurrences)
+
+    print(f"Structure read in {time.perf_counter() - aStartTime:.2f} s")
+
+    print("Completed")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: " + os.path.abspath(Path(__file__).resolve()) + " <input_file>, where:")
+        print("    <input_file>  is a name of the file to be read")
+        sys.exit(1)
+
+    aSource = os.path.abspath(sys.argv[1])
+
+    sys.exit(main(aSource))
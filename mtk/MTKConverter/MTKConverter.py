@@ -43,13 +43,18 @@ import MTKConverter_Application as app
 
 def PrintUsage():
     print ("Usage:")
-    print ("MTKConverter -i <import_file> -p <process> -e <export_folder>\n")
+    print ("MTKConverter -i <import_file> -p <process>[,<process>...] -e <export_folder> [-j <workers>] [-t] [-c <cache_folder>]\n")
     print ("Arguments:")
     print ("  <import_file> - import file name")
-    print ("  <process> - manufacturing process or algorithm name")
+    print ("  <process> - manufacturing process or algorithm name, several comma-separated names")
+    print ("              are applied to the same imported model and reported in one file")
     print ("  <export_folder> - export folder name")
+    print ("  <workers> - number of worker processes parts are processed by in parallel (default: 1)")
+    print ("  <cache_folder> - folder of the machining results cache, shared by subsequent runs (default: no cache)")
+    print ("  -t - write time spent in every stage and on every part to the \"timings\" section of the report")
     print ("Example:")
     print ("MTKConverter -i C:\\models\\test.step -p machining_milling -e C:\\models\\test")
+    print ("MTKConverter -i C:\\models\\test.step -p wall_thickness,machining_milling,sheet_metal -e C:\\models\\test")
 
     print ("\nRecognized processes:")
     print ("  wall_thickness   :\t Wall Thickness analysis")
@@ -57,7 +62,8 @@ def PrintUsage():
     print ("  machining_turning:\t CNC Machining Lathe+Milling feature recognition and dfm analyzis")
     print ("  sheet_metal      :\t Sheet Metal feature recognition, unfolding and dfm analysis")
 
-def main (theSource: str, theProcess: str, theTarget: str):
+def main (theSource: str, theProcesses, theTarget: str, theWorkerCount: int = 1, theIsWritingTimings: bool = False,
+          theCacheDir: str = ""):
     aKey = license.Value()
     anMTKKey = mtk_license.Value()
 
@@ -69,7 +75,7 @@ def main (theSource: str, theProcess: str, theTarget: str):
         return 1
 
     anApp = app.MTKConverter_Application()
-    aRes = anApp.Run (theSource, theProcess, theTarget)
+    aRes = anApp.Run (theSource, theProcesses, theTarget, theWorkerCount, theIsWritingTimings, theCacheDir)
     return aRes.value
 
 if __name__ == "__main__":
@@ -81,10 +87,28 @@ if __name__ == "__main__":
 
     if len(sys.argv) < 6 :
         print("Invalid number of arguments. Please use \"-h\" or \"--help\" for usage information.")
-        sys.exit(app.MTKConverter_ReturnCode.InvalidArgumentsNumber.value)
+        sys.exit(app.MTKConverter_ReturnCode.MTKConverter_RC_InvalidArgumentsNumber.value)
 
     aSource  = os.path.abspath(sys.argv[2])
-    aProcess = sys.argv[4]
+    aProcesses = sys.argv[4].split(",")
     aTarget  = os.path.abspath(sys.argv[6])
 
-    sys.exit(main(aSource, aProcess, aTarget))
+    aWorkerCount = 1
+    anIsWritingTimings = False
+    aCacheDir = ""
+    i = 7
+    while i < len(sys.argv):
+        if sys.argv[i] == "-j" and i + 1 < len(sys.argv) and sys.argv[i + 1].isdigit():
+            aWorkerCount = int(sys.argv[i + 1])
+            i += 2
+        elif sys.argv[i] == "-c" and i + 1 < len(sys.argv):
+            aCacheDir = os.path.abspath(sys.argv[i + 1])
+            i += 2
+        elif sys.argv[i] == "-t":
+            anIsWritingTimings = True
+            i += 1
+        else:
+            print("Invalid argument ", sys.argv[i], ". Please use \"-h\" or \"--help\" for usage information.", sep="")
+            sys.exit(app.MTKConverter_ReturnCode.MTKConverter_RC_InvalidArgument.value)
+
+    sys.exit(main(aSource, aProcesses, aTarget, aWorkerCount, anIsWritingTimings, aCacheDir))
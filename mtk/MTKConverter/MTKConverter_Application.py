@@ -27,6 +27,9 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 import cadexchanger.CadExCore as core
@@ -36,7 +39,9 @@ import cadexchanger.CadExMTK as mtk
 import MTKConverter_PartProcessor as part_proc
 
 from MTKConverter_Report import MTKConverter_Report
+from MTKConverter_MachiningCache import MTKConverter_MachiningCache
 from MTKConverter_MachiningProcessor import MTKConverter_MachiningProcessor
+from MTKConverter_ParallelProcessor import MTKConverter_ParallelProcessor
 from MTKConverter_SheetMetalProcessor import MTKConverter_SheetMetalProcessor
 from MTKConverter_WallThicknessProcessor import MTKConverter_WallThicknessProcessor
 
@@ -92,7 +97,7 @@ class MTKConverter_Application:
         if theProcessName in aProcessMap:
             return aProcessMap[theProcessName]
         else:
-            return mtk.MTKConverter_PT_Undefined
+            return MTKConverter_ProcessType.MTKConverter_PT_Undefined
 
     @staticmethod
     def __Import(theFilePath: str, theModel: core.ModelData_Model):
@@ -150,32 +155,46 @@ class MTKConverter_Application:
         for i in theProcessor.myData:
             theReport.AddData(i)
 
+    # Returns None if theProcess is not recognized.
+    # If theCacheDir is given, machining results are cached in it.
+    @staticmethod
+    def CreateProcessor(theProcess: str, theProcessModel: core.ModelData_Model, theCacheDir: str = ""):
+        aCache = MTKConverter_MachiningCache(theCacheDir) if theCacheDir else None
+        aProcessType = MTKConverter_Application.__ProcessType(theProcess)
+        if aProcessType == MTKConverter_ProcessType.MTKConverter_PT_WallThickness:
+            return MTKConverter_WallThicknessProcessor(800)
+        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_MachiningMilling:
+            return MTKConverter_MachiningProcessor(mtk.Machining_OT_Milling, aCache)
+        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_MachiningTurning:
+            return MTKConverter_MachiningProcessor(mtk.Machining_OT_LatheMilling, aCache)
+        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_SheetMetal:
+            return MTKConverter_SheetMetalProcessor(theProcessModel)
+        return None
+
     @staticmethod
     def __Process (theProcess: str,
                    theModel: core.ModelData_Model,
                    theReport: MTKConverter_Report,
-                   theProcessModel: core.ModelData_Model):
+                   theProcessModel: core.ModelData_Model,
+                   theParallelProcessor: MTKConverter_ParallelProcessor,
+                   theCacheDir: str):
         print("Processing ", theProcess, "...", sep="", end="")
 
-        theModel.AssignUuids()
+        aProcessor = MTKConverter_Application.CreateProcessor(theProcess, theProcessModel, theCacheDir)
+        if aProcessor is None:
+            return MTKConverter_ReturnCode.MTKConverter_RC_InvalidArgument
 
-        aProcessType = MTKConverter_Application.__ProcessType(theProcess)
-        if aProcessType == MTKConverter_ProcessType.MTKConverter_PT_WallThickness:
-            aProcessor = MTKConverter_WallThicknessProcessor(800)
-            MTKConverter_Application.__ApplyProcessorToModel(aProcessor, theModel, theReport)
-        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_MachiningMilling:
-            aProcessor = MTKConverter_MachiningProcessor(mtk.Machining_OT_Milling)
-            MTKConverter_Application.__ApplyProcessorToModel(aProcessor, theModel, theReport)
-        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_MachiningTurning:
-            aProcessor = MTKConverter_MachiningProcessor(mtk.Machining_OT_LatheMilling)
-            MTKConverter_Application.__ApplyProcessorToModel(aProcessor, theModel, theReport)
-        elif aProcessType == MTKConverter_ProcessType.MTKConverter_PT_SheetMetal:
+        if MTKConverter_Application.__ProcessType(theProcess) == MTKConverter_ProcessType.MTKConverter_PT_SheetMetal:
             anUnfoldedName = str(theModel.Name()) + "_unfolded"
             theProcessModel.SetName(core.Base_UTF16String(anUnfoldedName))
-            aProcessor = MTKConverter_SheetMetalProcessor(theProcessModel)
-            MTKConverter_Application.__ApplyProcessorToModel(aProcessor, theModel, theReport)
+
+        if theParallelProcessor:
+            anError = theParallelProcessor.Apply(theProcess, theReport, theProcessModel)
+            if anError:
+                print("\nERROR: Failed to process ", theProcess, ": ", anError, ". Exiting", sep="")
+                return MTKConverter_ReturnCode.MTKConverter_RC_ProcessError
         else:
-            return MTKConverter_ReturnCode.MTKConverter_RC_InvalidArgument
+            MTKConverter_Application.__ApplyProcessorToModel(aProcessor, theModel, theReport)
 
         return MTKConverter_ReturnCode.MTKConverter_RC_OK
 
@@ -186,43 +205,119 @@ class MTKConverter_Application:
                  theReport: MTKConverter_Report,
                  theProcessModel: core.ModelData_Model):
         print("Exporting ", theFolderPath, "...", sep="", end="")
-        aModelPath = theFolderPath + "/" + str(theModel.Name()) + ".cdxweb" + "/scenegraph.cdxweb"
-        if not theModel.Save(core.Base_UTF16String(aModelPath), theWriterParams):
-            print("\nERROR: Failed to export ", aModelPath, ". Exiting", sep="")
-            return MTKConverter_ReturnCode.ExportError
-
-        aThumbnailPath = theFolderPath + "/thumbnail.png"
-        if not MTKConverter_Application.__CreateOriginModelThumbnail(core.Base_UTF16String(aThumbnailPath), theModel):
-            print("\nERROR: Failed to create thumbnail ", aThumbnailPath, ". Exiting", sep="")
-            return MTKConverter_ReturnCode.ExportError
-
-        if not theProcessModel.IsEmpty():
+        aStartTime = time.perf_counter()
+
+        def SaveModelAndThumbnail():
+            aModelPath = theFolderPath + "/" + str(theModel.Name()) + ".cdxweb" + "/scenegraph.cdxweb"
+            if not theModel.Save(core.Base_UTF16String(aModelPath), theWriterParams):
+                return "Failed to export " + aModelPath
+            aThumbnailPath = theFolderPath + "/thumbnail.png"
+            if not MTKConverter_Application.__CreateOriginModelThumbnail(core.Base_UTF16String(aThumbnailPath), theModel):
+                return "Failed to create thumbnail " + aThumbnailPath
+            return ""
+
+        def SaveProcessModel():
             aProcessModelPath = theFolderPath + "/" + str(theProcessModel.Name()) + ".cdxweb" + "/scenegraph.cdxweb"
             if not theProcessModel.Save(core.Base_UTF16String(aProcessModelPath), theWriterParams):
-                print("\nERROR: Failed to export ", aProcessModelPath, ". Exiting", sep="")
-                return MTKConverter_ReturnCode.ExportError
-
-        aJsonPath = theFolderPath + "/process_data.json"
-        if not theReport.WriteToJSON (aJsonPath):
-            print("\nERROR: Failed to create JSON file ", aJsonPath, ". Exiting", sep="")
-            return MTKConverter_ReturnCode.ExportError
+                return "Failed to export " + aProcessModelPath
+            return ""
+
+        def WriteReport():
+            aJsonPath = theFolderPath + "/process_data.json"
+            if not theReport.WriteToJSON (aJsonPath):
+                return "Failed to create JSON file " + aJsonPath
+            return ""
+
+        # Steps running concurrently never share a model: the original model is saved and then rendered
+        # to the thumbnail by one step, the process model is a separate model and the report is plain data.
+        # The writer parameters are only read by the writers. The report containing timings is written
+        # after the other steps, so that it includes the export time.
+        anIsWritingTimings = theReport.IsWritingTimings()
+        aSteps = [SaveModelAndThumbnail]
+        if not theProcessModel.IsEmpty():
+            aSteps.append(SaveProcessModel)
+        if not anIsWritingTimings:
+            aSteps.append(WriteReport)
+
+        with ThreadPoolExecutor(len(aSteps)) as anExecutor:
+            aFutures = [anExecutor.submit(aStep) for aStep in aSteps]
+
+        # All the steps are completed at this point, so every failure is reported
+        anErrors = []
+        for aFuture in aFutures:
+            anException = aFuture.exception()
+            if anException is None:
+                anError = aFuture.result()
+            elif isinstance(anException, core.Base_Exception):
+                anError = str(anException.What())
+            else:
+                anError = "Unhandled exception caught: " + str(anException)
+            if anError:
+                anErrors.append(anError)
+
+        if anIsWritingTimings:
+            theReport.SetStageTime("export", time.perf_counter() - aStartTime)
+            anError = WriteReport()
+            if anError:
+                anErrors.append(anError)
+
+        if anErrors:
+            for anError in anErrors:
+                print("\nERROR: ", anError, ".", sep="", end="")
+            print(" Exiting")
+            return MTKConverter_ReturnCode.MTKConverter_RC_ExportError
 
         return MTKConverter_ReturnCode.MTKConverter_RC_OK
 
-    def Run(self, theSource: str, theProcess: str, theTarget: str):
+    # theProcesses is a list of process names (or a comma-separated string of them).
+    # The model is imported once and all the processes are applied to it, their results are
+    # written to the same report, and the model and its thumbnail are exported once.
+    # If theWorkerCount is greater than 1, parts are processed in parallel by as many worker processes.
+    # If theIsWritingTimings is set, the report contains the time spent in every stage and for every part.
+    # If theCacheDir is given, machining results of solids are cached in it and reused by subsequent runs.
+    def Run(self, theSource: str, theProcesses, theTarget: str, theWorkerCount: int = 1, theIsWritingTimings: bool = False,
+            theCacheDir: str = ""):
+        if isinstance(theProcesses, str):
+            theProcesses = theProcesses.split(",")
+
+        aProcesses = []
+        for aProcess in theProcesses:
+            aProcess = aProcess.strip()
+            if MTKConverter_Application.__ProcessType(aProcess) == MTKConverter_ProcessType.MTKConverter_PT_Undefined:
+                print("ERROR: Unrecognized process ", aProcess, ". Exiting", sep="")
+                return MTKConverter_ReturnCode.MTKConverter_RC_InvalidArgument
+            if aProcess not in aProcesses:
+                aProcesses.append(aProcess)
+
         aModel = core.ModelData_Model()
         aProcessModel = core.ModelData_Model()
-        aReport = MTKConverter_Report()
+        aReport = MTKConverter_Report(theIsWritingTimings)
+        aParallelProcessor = MTKConverter_ParallelProcessor(theWorkerCount, theCacheDir) if theWorkerCount > 1 else None
 
         core.Base_Settings.Default().SetValue(core.Base_Settings.UseExceptions, True)
 
         aRes = MTKConverter_ReturnCode.MTKConverter_RC_OK
         try:
+            aStartTime = time.perf_counter()
             aRes = MTKConverter_Application.__Import (theSource, aModel)
+            aReport.SetStageTime("import", time.perf_counter() - aStartTime)
             print("Done.")
+            aStartTime = time.perf_counter()
             if aRes == MTKConverter_ReturnCode.MTKConverter_RC_OK:
-                aRes = MTKConverter_Application.__Process (theProcess, aModel, aReport, aProcessModel)
+                # Uuids are assigned once, so that all the processes refer to the same part ids
+                aModel.AssignUuids()
+            if aRes == MTKConverter_ReturnCode.MTKConverter_RC_OK and aParallelProcessor:
+                if not aParallelProcessor.Start(aModel):
+                    print("ERROR: Failed to prepare the model for parallel processing. Exiting")
+                    aRes = MTKConverter_ReturnCode.MTKConverter_RC_ProcessError
+            for aProcess in aProcesses:
+                if aRes != MTKConverter_ReturnCode.MTKConverter_RC_OK:
+                    break
+                aRes = MTKConverter_Application.__Process (aProcess, aModel, aReport, aProcessModel, aParallelProcessor, theCacheDir)
                 print("Done.")
+            if aParallelProcessor:
+                aParallelProcessor.Stop()
+            aReport.SetStageTime("process", time.perf_counter() - aStartTime)
             if aRes == MTKConverter_ReturnCode.MTKConverter_RC_OK:
                 aRes = MTKConverter_Application.__Export (theTarget, self.myCDXWEBWriterParameters, aModel, aReport, aProcessModel)
                 print("Done.")
@@ -241,5 +336,8 @@ class MTKConverter_Application:
         except:
             print("Failed.\nERROR: Unhandled exception caught.")
             return MTKConverter_ReturnCode.MTKConverter_RC_GeneralException
+        finally:
+            if aParallelProcessor:
+                aParallelProcessor.Stop()
 
         return aRes
@@ -0,0 +1,157 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+import re
+import sys
+import uuid
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+import cadexchanger.CadExMTK as mtk
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../conversion/helpers/"))
+
+from sdk_version import SDKVersion
+
+# On-disk cache of machining feature recognition and DFM analysis results.
+# An entry is keyed by a geometry fingerprint of the solid, the machining operation, the values of all the
+# analyzer parameters and the SDK version, so a solid reused in many models (e.g. a catalog part) is analyzed
+# only once. The fingerprint does not depend on shape ids or on the position of the solid: faces and edges
+# are put into a canonical order by their geometric properties (surface type, area and centroid of a face,
+# end points of an edge, all relative to the centroid of the solid). Results are stored with canonical
+# indices instead of shape ids and the indices are mapped to shape ids of the solid being processed on fetch.
+# Axis directions in the results depend on the orientation of the solid, so differently oriented copies of a
+# solid are different entries. Solids with faces or edges that can't be told apart are not cached.
+# An entry keeps the results rendered to the report, as features and issues can't be restored to SDK objects.
+class MTKConverter_MachiningCache:
+    # Must be changed whenever the rendering of the results or the fingerprint change
+    myVersion = 2
+
+    myShapeIdPattern = re.compile(r'"id": "(\d+)"')
+
+    def __init__(self, theDir: str):
+        self.myDir = theDir
+        os.makedirs(self.myDir, exist_ok=True)
+
+    # Returns the key and shape ids of faces and edges of theSolid in the canonical order,
+    # or (None, None) if the canonical order is ambiguous
+    @staticmethod
+    def Key(theBRep: cadex.ModelData_BRepRepresentation, theSolid: cadex.ModelData_Solid, theOperation,
+            theParameters: list):
+        aHash = hashlib.sha256(f"MTKConverter machining {MTKConverter_MachiningCache.myVersion} {theOperation}".encode())
+        aHash.update(f"\nSDK {SDKVersion(mtk)}".encode())
+        for aParameters in theParameters:
+            aHash.update(f"\n{MTKConverter_MachiningCache.__ParametersString(aParameters)}".encode())
+
+        aCentroid = MTKConverter_MachiningCache.__Centroid(theSolid)
+        aHash.update(f"\nArea {cadex.ModelAlgo_ValidationProperty.ComputeSurfaceArea(theSolid):.6g}".encode())
+        aHash.update(f"\nVolume {cadex.ModelAlgo_ValidationProperty.ComputeVolume(theSolid):.6g}".encode())
+
+        aShapes = []
+        for aShape in cadex.ModelData_Shape_Iterator(theSolid, cadex.ModelData_ST_Face):
+            aFace = cadex.ModelData_Face.Cast(aShape)
+            aSignature = (f"Face {aFace.Surface().Type()} {cadex.ModelAlgo_ValidationProperty.ComputeSurfaceArea(aFace):.6g}"
+                          f" {MTKConverter_MachiningCache.__RelativePoint(MTKConverter_MachiningCache.__Centroid(aFace), aCentroid)}")
+            aShapes.append((aSignature, theBRep.ShapeId(aShape)))
+        for aShape in cadex.ModelData_Shape_Iterator(theSolid, cadex.ModelData_ST_Edge):
+            aPoints = sorted(MTKConverter_MachiningCache.__RelativePoint(cadex.ModelData_Vertex.Cast(aVertex).Point(), aCentroid)
+                             for aVertex in cadex.ModelData_Shape_Iterator(aShape, cadex.ModelData_ST_Vertex))
+            aShapes.append(("Edge " + " ".join(aPoints), theBRep.ShapeId(aShape)))
+
+        # The order only has to be the same for every copy of the solid
+        aShapes.sort(key=lambda theShape: theShape[0])
+        for i in range(1, len(aShapes)):
+            if aShapes[i][0] == aShapes[i - 1][0]:
+                return None, None
+        for aSignature, _ in aShapes:
+            aHash.update(f"\n{aSignature}".encode())
+
+        return aHash.hexdigest(), [aShapeId for _, aShapeId in aShapes]
+
+    # Returns the cached results referring to theShapeIds or None on a cache miss
+    def Fetch(self, theKey: str, theShapeIds: list):
+        try:
+            with open(self.__EntryPath(theKey), "r") as aFile:
+                aData = json.load(aFile)["data"]
+            return MTKConverter_MachiningCache.myShapeIdPattern.sub(
+                lambda theMatch: f'"id": "{theShapeIds[int(theMatch.group(1))]}"', aData)
+        except (OSError, ValueError, KeyError, IndexError):
+            return None
+
+    # Stores theData with shape ids replaced by their indices in theShapeIds. Results referring to
+    # other shapes (e.g. vertices) are not stored.
+    def Store(self, theKey: str, theData: str, theShapeIds: list):
+        anIndices = {aShapeId: i for i, aShapeId in enumerate(theShapeIds)}
+        if any(int(anId) not in anIndices for anId in MTKConverter_MachiningCache.myShapeIdPattern.findall(theData)):
+            return
+        aData = MTKConverter_MachiningCache.myShapeIdPattern.sub(
+            lambda theMatch: f'"id": "{anIndices[int(theMatch.group(1))]}"', theData)
+
+        # The entry is written aside and published with a single rename,
+        # so concurrent readers (e.g. other worker processes) never see a partially written entry
+        anEntryPath = self.__EntryPath(theKey)
+        aTmpPath = anEntryPath + "." + uuid.uuid4().hex + ".tmp"
+        with open(aTmpPath, "w") as aFile:
+            json.dump({"version": MTKConverter_MachiningCache.myVersion, "data": aData}, aFile)
+        os.replace(aTmpPath, anEntryPath)
+
+    def __EntryPath(self, theKey: str) -> str:
+        return os.path.join(self.myDir, theKey + ".json")
+
+    @staticmethod
+    def __Centroid(theShape: cadex.ModelData_Shape) -> cadex.ModelData_Point:
+        aCentroid = cadex.ModelData_Point()
+        cadex.ModelAlgo_ValidationProperty.ComputeCentroid(theShape, aCentroid)
+        return aCentroid
+
+    # Coordinates are rounded, so that the same solid at another position gets the same string
+    @staticmethod
+    def __RelativePoint(thePoint: cadex.ModelData_Point, theOrigin: cadex.ModelData_Point) -> str:
+        aCoordinates = (thePoint.X() - theOrigin.X(), thePoint.Y() - theOrigin.Y(), thePoint.Z() - theOrigin.Z())
+        return "(" + " ".join(f"{round(c, 5) + 0.0:.5f}" for c in aCoordinates) + ")"
+
+    # Values of all the parameters that have both a getter and a setter, e.g. "Operation" and "SetOperation"
+    @staticmethod
+    def __ParametersString(theParameters) -> str:
+        aValues = []
+        for aName in sorted(dir(theParameters)):
+            if not aName[:1].isupper() or not hasattr(theParameters, "Set" + aName):
+                continue
+            try:
+                aValue = getattr(theParameters, aName)()
+            except TypeError:
+                # Getters with arguments (e.g. indexed values) are not covered
+                continue
+            if isinstance(aValue, (bool, int, float, str)):
+                aValues.append(f"{aName}={aValue!r}")
+        return type(theParameters).__name__ + " " + " ".join(aValues)
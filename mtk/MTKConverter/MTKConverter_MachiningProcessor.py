@@ -27,57 +27,99 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import time
+
 import cadexchanger.CadExCore as cadex
 import cadexchanger.CadExMTK as mtk
 
 import MTKConverter_PartProcessor as part_proc
 
+from MTKConverter_MachiningCache import MTKConverter_MachiningCache
+
 class MTKConverter_MachiningData(part_proc.MTKConverter_ProcessData):
     def __init__(self, thePart: cadex.ModelData_Part):
         super().__init__(thePart)
         self.myFeatureList = mtk.MTKBase_FeatureList()
         self.myIssueList = mtk.MTKBase_FeatureList()
         self.myOperation = mtk.Machining_OT_Undefined
+        # Results rendered to the report, if they are taken from or put to a MTKConverter_MachiningCache
+        self.myReportData = None
 
+# If theCache is given, results of solids found in it are taken from there instead of being computed
 class MTKConverter_MachiningProcessor(part_proc.MTKConverter_VoidPartProcessor):
-    def __init__(self, theOperation):
+    def __init__(self, theOperation, theCache: MTKConverter_MachiningCache = None):
         super().__init__()
         self.myOperation = theOperation
+        self.myCache = theCache
+
+        self.myFeatureRecognizerParameters = mtk.Machining_FeatureRecognizerParameters()
+        self.myFeatureRecognizerParameters.SetOperation(theOperation)
+        self.myDrillingParameters = mtk.DFMMachining_DrillingAnalyzerParameters()
+        self.myMillingParameters = mtk.DFMMachining_MillingAnalyzerParameters()
+        self.myTurningParameters = mtk.DFMMachining_TurningAnalyzerParameters()
 
     def ProcessSolid (self, thePart: cadex.ModelData_Part, theSolid: cadex.ModelData_Solid):
         aMachiningData = MTKConverter_MachiningData(thePart)
         self.myData.append(aMachiningData)
         aMachiningData.myOperation = self.myOperation
 
-        aParams = mtk.Machining_FeatureRecognizerParameters()
-        aParams.SetOperation(self.myOperation)
-        aFeatureRecognizer = mtk.Machining_FeatureRecognizer(aParams)
+        if self.myCache is None:
+            self.__Analyze(theSolid, aMachiningData)
+            return
+
+        aStartTime = time.perf_counter()
+        aParameters = [self.myFeatureRecognizerParameters, self.myDrillingParameters, self.myMillingParameters]
+        if self.myOperation == mtk.Machining_OT_LatheMilling:
+            aParameters.append(self.myTurningParameters)
+        aKey, aShapeIds = MTKConverter_MachiningCache.Key(thePart.BRepRepresentation(), theSolid, self.myOperation,
+                                                          aParameters)
+        if aKey is not None:
+            aMachiningData.myReportData = self.myCache.Fetch(aKey, aShapeIds)
+        aMachiningData.AddTime("cacheLookup", time.perf_counter() - aStartTime)
+        if aMachiningData.myReportData is not None:
+            return
+
+        self.__Analyze(theSolid, aMachiningData)
+        if aKey is not None:
+            # Imported here as the report module imports this one
+            from MTKConverter_Report import MTKConverter_Report
+
+            aMachiningData.myReportData = MTKConverter_Report.MachiningDataToString(aMachiningData)
+            self.myCache.Store(aKey, aMachiningData.myReportData, aShapeIds)
+
+    def __Analyze(self, theSolid: cadex.ModelData_Solid, theMachiningData: MTKConverter_MachiningData):
+        aFeatureRecognizer = mtk.Machining_FeatureRecognizer(self.myFeatureRecognizerParameters)
         anAnalyzer = mtk.Machining_Analyzer()
         anAnalyzer.AddTool (aFeatureRecognizer)
+        aStartTime = time.perf_counter()
         aData = anAnalyzer.Perform(theSolid)
+        theMachiningData.AddTime("featureRecognition", time.perf_counter() - aStartTime)
         if aData.IsEmpty():
             return
 
         # Features
         for i in aData.FeatureList():
-            aMachiningData.myFeatureList.Append(i)
+            theMachiningData.myFeatureList.Append(i)
 
         # Issues
-        aDrillingParameters = mtk.DFMMachining_DrillingAnalyzerParameters()
-        aDrillingAnalyzer = mtk.DFMMachining_Analyzer(aDrillingParameters)
-        aMachiningData.myIssueList = aDrillingAnalyzer.Perform(theSolid, aData)
+        aDrillingAnalyzer = mtk.DFMMachining_Analyzer(self.myDrillingParameters)
+        aStartTime = time.perf_counter()
+        theMachiningData.myIssueList = aDrillingAnalyzer.Perform(theSolid, aData)
+        theMachiningData.AddTime("drillingDfm", time.perf_counter() - aStartTime)
 
-        aMillingParameters = mtk.DFMMachining_MillingAnalyzerParameters()
-        aMillingAnalyzer = mtk.DFMMachining_Analyzer(aMillingParameters)
+        aMillingAnalyzer = mtk.DFMMachining_Analyzer(self.myMillingParameters)
+        aStartTime = time.perf_counter()
         aMillingIssueList = aMillingAnalyzer.Perform(theSolid, aData)
+        theMachiningData.AddTime("millingDfm", time.perf_counter() - aStartTime)
         for anIssue in aMillingIssueList:
             if self.myOperation == mtk.Machining_OT_LatheMilling and not mtk.DFMMachining_DeepPocketIssue.CompareType(anIssue):
                 continue
-            aMachiningData.myIssueList.Append(anIssue)
+            theMachiningData.myIssueList.Append(anIssue)
 
         if self.myOperation == mtk.Machining_OT_LatheMilling:
-            aTurninigParameters = mtk.DFMMachining_TurningAnalyzerParameters()
-            aTurningAnalyzer = mtk.DFMMachining_Analyzer(aTurninigParameters)
+            aTurningAnalyzer = mtk.DFMMachining_Analyzer(self.myTurningParameters)
+            aStartTime = time.perf_counter()
             aTurningIssueList = aTurningAnalyzer.Perform(theSolid, aData)
+            theMachiningData.AddTime("turningDfm", time.perf_counter() - aStartTime)
             for anIssue in aTurningIssueList:
-                aMachiningData.myIssueList.Append(anIssue)
+                theMachiningData.myIssueList.Append(anIssue)
@@ -0,0 +1,98 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import difflib
+import os
+import shutil
+import sys
+import tempfile
+
+from pathlib import Path
+
+import cadexchanger.CadExCore as cadex
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+
+import cadex_license as license
+import mtk_license
+
+import MTKConverter_Application as app
+
+# Runs the converter on the same file serially and with several worker processes and compares the reports.
+# Part Uuids and shape ids in the report of the parallel run come from the models read back by the workers,
+# so the reports only match if they survive saving and reading of the native files.
+def main (theSource: str, theProcesses, theWorkerCount: int = 4):
+    aKey = license.Value()
+    anMTKKey = mtk_license.Value()
+
+    if not cadex.LicenseManager.Activate(aKey):
+        print("Failed to activate CAD Exchanger license.")
+        return 1
+    if not cadex.LicenseManager.Activate(anMTKKey):
+        print("Failed to activate Manufacturing Toolkit license.")
+        return 1
+
+    aTempDir = tempfile.mkdtemp(prefix="mtkconverter_check_")
+    try:
+        aReports = []
+        for aWorkerCount in (1, theWorkerCount):
+            aTarget = os.path.join(aTempDir, "workers_" + str(aWorkerCount))
+            anApp = app.MTKConverter_Application()
+            aRes = anApp.Run (theSource, theProcesses, aTarget, aWorkerCount)
+            if aRes != app.MTKConverter_ReturnCode.MTKConverter_RC_OK:
+                print("ERROR: Conversion with ", aWorkerCount, " worker(s) failed", sep="")
+                return aRes.value
+            with open(os.path.join(aTarget, "process_data.json"), "r") as aFile:
+                aReports.append(aFile.readlines())
+
+        aDiff = list(difflib.unified_diff(aReports[0], aReports[1], "serial", "parallel", n=2))
+        if aDiff:
+            print("ERROR: Reports of the serial and the parallel runs differ:")
+            sys.stdout.writelines(aDiff[:50])
+            return 1
+    finally:
+        shutil.rmtree(aTempDir, ignore_errors=True)
+
+    print("Reports of the serial and the parallel runs are identical")
+    return 0
+
+# The guard is required as worker processes may import this script (e.g. on Windows and macOS)
+if __name__ == "__main__":
+    if len(sys.argv) > 4 or (len(sys.argv) > 1 and sys.argv[1] in ("-?", "/?", "-h", "--help")):
+        print ("Usage:")
+        print ("MTKConverter_ParallelCheck [<import_file> [<process>[,<process>...] [<workers>]]]\n")
+        print ("Defaults: ../../models/Fresamento_CAM1_v3.stp wall_thickness,machining_milling,sheet_metal 4")
+        sys.exit()
+
+    aSource = os.path.abspath(sys.argv[1] if len(sys.argv) > 1
+                              else os.path.dirname(Path(__file__).resolve()) + "/../../models/Fresamento_CAM1_v3.stp")
+    aProcesses = (sys.argv[2] if len(sys.argv) > 2 else "wall_thickness,machining_milling,sheet_metal").split(",")
+    aWorkerCount = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    sys.exit(main(aSource, aProcesses, aWorkerCount))
@@ -0,0 +1,219 @@
+# $Id$
+
+# Copyright (C) 2008-2014, Roman Lygin. All rights reserved.
+# Copyright (C) 2014-2023, CADEX. All rights reserved.
+
+# This file is part of the CAD Exchanger software.
+
+# You may use this file under the terms of the BSD license as follows:
+
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import cadexchanger.CadExCore as core
+
+sys.path.append(os.path.abspath(os.path.dirname(Path(__file__).resolve()) + "/../../"))
+
+import cadex_license as license
+import mtk_license
+
+from MTKConverter_Report import MTKConverter_Report
+
+class MTKConverter_PartCollector(core.ModelData_Model_VoidElementVisitor):
+    def __init__(self):
+        super().__init__()
+        self.myParts = []
+
+    def VisitPart(self, thePart: core.ModelData_Part):
+        self.myParts.append(thePart)
+
+    # Returns unique parts of theModel in the order they are visited by processors in the serial mode
+    @staticmethod
+    def Collect(theModel: core.ModelData_Model):
+        aCollector = MTKConverter_PartCollector()
+        aVisitor = core.ModelData_SceneGraphElementUniqueVisitor(aCollector)
+        theModel.AcceptElementVisitor(aVisitor)
+        return aCollector.myParts
+
+class MTKConverter_BatchTask:
+    def __init__(self, theProcess: str, theBatchPath: str, theUnfoldedPath: str):
+        self.myProcess = theProcess
+        self.myBatchPath = theBatchPath
+        self.myUnfoldedPath = theUnfoldedPath
+
+class MTKConverter_BatchResult:
+    def __init__(self):
+        self.myPartData = []
+        self.myPartTimings = []
+        self.myUnfoldedPath = ""
+        self.myError = ""
+
+# Applies processors to unique parts of the model in a pool of worker processes.
+# SDK objects can't be sent between processes, so unique parts of the model (with Uuids already assigned)
+# are split into consecutive batches, and every batch is saved to a temporary native file as a model with
+# the parts as roots. Every batch file is read by the one worker processing it (and kept while the worker
+# gets the same batch for the next process), so the model is read about once in total. Workers apply
+# processors to the batch models the same way as in the serial mode, return process data of every part
+# rendered to JSON and save unfolded sheet metal parts of the batch to one temporary file. Results are added
+# to the report and to the process model in the batch order, so the output is the same as in the serial mode.
+# A worker killed by a native crash breaks the pool, the process is then reported as failed.
+class MTKConverter_ParallelProcessor:
+    myIsLicenseActive = False
+    myCacheDir = ""
+    myBatchPath = ""
+    myBatchModel = None
+
+    # Several batches per worker balance the load if processing times of parts differ a lot
+    myBatchesPerWorker = 4
+
+    def __init__(self, theWorkerCount: int, theCacheDir: str = ""):
+        self.myWorkerCount = theWorkerCount
+        self.myCacheDir = theCacheDir
+        self.myTempDir = ""
+        self.myBatchPaths = []
+        self.myPool = None
+
+    def Start(self, theModel: core.ModelData_Model):
+        self.myTempDir = tempfile.mkdtemp(prefix="mtkconverter_")
+
+        aParts = MTKConverter_PartCollector.Collect(theModel)
+        aWorkerCount = max(1, min(self.myWorkerCount, len(aParts)))
+        aBatchCount = max(1, min(aWorkerCount * MTKConverter_ParallelProcessor.myBatchesPerWorker, len(aParts)))
+        self.myBatchPaths = []
+        for i in range(aBatchCount):
+            aBatchModel = core.ModelData_Model()
+            for aPart in aParts[len(aParts) * i // aBatchCount:len(aParts) * (i + 1) // aBatchCount]:
+                aBatchModel.AddRoot(aPart)
+            aBatchPath = os.path.join(self.myTempDir, "batch_" + str(i) + ".cdx")
+            if not core.ModelData_ModelWriter().Write(aBatchModel, core.Base_UTF16String(aBatchPath)):
+                return False
+            self.myBatchPaths.append(aBatchPath)
+
+        # Worker processes are spawned rather than forked, as the SDK state of this process must not be shared
+        aContext = multiprocessing.get_context("spawn")
+        self.myPool = ProcessPoolExecutor(aWorkerCount, mp_context=aContext,
+                                          initializer=MTKConverter_ParallelProcessor.Initialize,
+                                          initargs=(self.myCacheDir,))
+        return True
+
+    def Stop(self):
+        if self.myPool:
+            self.myPool.shutdown()
+            self.myPool = None
+        if self.myTempDir:
+            shutil.rmtree(self.myTempDir, ignore_errors=True)
+            self.myTempDir = ""
+
+    # Returns an error message or an empty string on success
+    def Apply(self, theProcess: str, theReport: MTKConverter_Report, theProcessModel: core.ModelData_Model):
+        aTasks = []
+        for i, aBatchPath in enumerate(self.myBatchPaths):
+            anUnfoldedPath = os.path.join(self.myTempDir, theProcess + "_" + str(i) + ".cdx")
+            aTasks.append(MTKConverter_BatchTask(theProcess, aBatchPath, anUnfoldedPath))
+
+        aFutures = [self.myPool.submit(MTKConverter_ParallelProcessor.ProcessBatch, aTask) for aTask in aTasks]
+        try:
+            for aFuture in aFutures:
+                anError = MTKConverter_ParallelProcessor.__AddResult(aFuture.result(), theReport, theProcessModel)
+                if anError:
+                    return anError
+        except BrokenProcessPool:
+            return "Worker process terminated abruptly"
+        finally:
+            # Batches not started yet are not processed after an error
+            for aFuture in aFutures:
+                aFuture.cancel()
+        return ""
+
+    @staticmethod
+    def __AddResult(theResult: MTKConverter_BatchResult, theReport: MTKConverter_Report,
+                    theProcessModel: core.ModelData_Model):
+        if theResult.myError:
+            return theResult.myError
+        for aPartData, aPartTimings in zip(theResult.myPartData, theResult.myPartTimings):
+            theReport.AddRawData(aPartData, aPartTimings)
+        if theResult.myUnfoldedPath:
+            anUnfoldedModel = core.ModelData_Model()
+            if not core.ModelData_ModelReader().Read(core.Base_UTF16String(theResult.myUnfoldedPath), anUnfoldedModel):
+                return "Failed to read unfolded parts " + theResult.myUnfoldedPath
+            for aRoot in anUnfoldedModel.GetElementIterator():
+                theProcessModel.AddRoot(aRoot)
+        return ""
+
+    @staticmethod
+    def Initialize(theCacheDir: str):
+        aParallelProcessor = MTKConverter_ParallelProcessor
+        aParallelProcessor.myCacheDir = theCacheDir
+        aParallelProcessor.myIsLicenseActive = (core.LicenseManager.Activate(license.Value())
+                                                and core.LicenseManager.Activate(mtk_license.Value()))
+        if aParallelProcessor.myIsLicenseActive:
+            core.Base_Settings.Default().SetValue(core.Base_Settings.UseExceptions, True)
+
+    @staticmethod
+    def ProcessBatch(theTask: MTKConverter_BatchTask):
+        # Imported here as the application module imports this one
+        from MTKConverter_Application import MTKConverter_Application
+
+        aResult = MTKConverter_BatchResult()
+        aParallelProcessor = MTKConverter_ParallelProcessor
+        if not aParallelProcessor.myIsLicenseActive:
+            aResult.myError = "Failed to activate CAD Exchanger license."
+            return aResult
+
+        try:
+            if aParallelProcessor.myBatchPath != theTask.myBatchPath:
+                aParallelProcessor.myBatchPath = ""
+                aParallelProcessor.myBatchModel = core.ModelData_Model()
+                if not core.ModelData_ModelReader().Read(core.Base_UTF16String(theTask.myBatchPath),
+                                                         aParallelProcessor.myBatchModel):
+                    aResult.myError = "Failed to read the model in a worker process."
+                    return aResult
+                aParallelProcessor.myBatchPath = theTask.myBatchPath
+
+            anUnfoldedModel = core.ModelData_Model()
+            aProcessor = MTKConverter_Application.CreateProcessor(theTask.myProcess, anUnfoldedModel,
+                                                                 aParallelProcessor.myCacheDir)
+            aVisitor = core.ModelData_SceneGraphElementUniqueVisitor(aProcessor)
+            aParallelProcessor.myBatchModel.AcceptElementVisitor(aVisitor)
+
+            for aData in aProcessor.myData:
+                aResult.myPartData.append(MTKConverter_Report.PartDataToString(aData))
+                aResult.myPartTimings.append(MTKConverter_Report.PartTimings(aData))
+
+            if not anUnfoldedModel.IsEmpty():
+                if not core.ModelData_ModelWriter().Write(anUnfoldedModel, core.Base_UTF16String(theTask.myUnfoldedPath)):
+                    aResult.myError = "Failed to save unfolded parts " + theTask.myUnfoldedPath
+                    return aResult
+                aResult.myUnfoldedPath = theTask.myUnfoldedPath
+        except core.Base_Exception as anE:
+            aResult.myError = str(anE.What())
+        except Exception as anE:
+            aResult.myError = "Unhandled exception caught: " + str(anE)
+        return aResult
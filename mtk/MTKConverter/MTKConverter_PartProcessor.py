@@ -34,6 +34,11 @@ import cadexchanger.CadExCore as cadex
 class MTKConverter_ProcessData:
     def __init__(self, thePart: cadex.ModelData_Part):
         self.myPart = thePart
+        self.myTimings = {}
+
+    # Accumulates time spent in theStage, as a part may contain several bodies
+    def AddTime(self, theStage: str, theTime: float):
+        self.myTimings[theStage] = self.myTimings.get(theStage, 0.0) + theTime
 
 class MTKConverter_PartProcessor(cadex.ModelData_Model_VoidElementVisitor):
     def __init__(self):
@@ -263,11 +263,61 @@ class OrderedFeatureList:
             self.ShapeIDs.append(theShapeIDs)
 
 class MTKConverter_Report:
-    def __init__(self):
+    # If theIsWritingTimings is set, the report also contains the "timings" section
+    # with the time spent in the application stages and in the processing of every part
+    def __init__(self, theIsWritingTimings = False):
         self.__myData = []
+        self.__myIsWritingTimings = theIsWritingTimings
+        self.__myStageTimes = {}
+        self.__myPartTimings = []
 
     def AddData(self, theData: part_proc.MTKConverter_ProcessData):
         self.__myData.append(theData)
+        self.__myPartTimings.append(MTKConverter_Report.PartTimings(theData))
+
+    # Adds process data already rendered by PartDataToString() (e.g. in another process)
+    # together with its timings returned by PartTimings()
+    def AddRawData(self, theData: str, theTimings):
+        self.__myData.append(theData)
+        self.__myPartTimings.append(theTimings)
+
+    def IsWritingTimings(self):
+        return self.__myIsWritingTimings
+
+    def SetStageTime(self, theStage: str, theTime: float):
+        self.__myStageTimes[theStage] = theTime
+
+    # Renders theProcessData exactly as WriteToJSON() writes it into the "parts" array
+    @staticmethod
+    def PartDataToString(theProcessData: part_proc.MTKConverter_ProcessData):
+        aStream = io.StringIO()
+        aWriter = JSONWriter(aStream, 2)
+
+        aWriter.OpenSection()
+        MTKConverter_Report.__WritePartProcessData(aWriter, theProcessData)
+        aWriter.CloseSection()
+
+        aRes = aStream.getvalue()
+        aStream.close()
+        return aRes
+
+    # Renders the machining results of theProcessData exactly as WriteToJSON() writes them into the part section
+    @staticmethod
+    def MachiningDataToString(theProcessData: mach_proc.MTKConverter_MachiningData):
+        aStream = io.StringIO()
+        aWriter = JSONWriter(aStream, 3)
+
+        MTKConverter_Report.__WriteMachiningData(aWriter, theProcessData)
+
+        aRes = aStream.getvalue()
+        aStream.close()
+        return aRes
+
+    # Returns part id, process name and stage times of theProcessData as plain data
+    @staticmethod
+    def PartTimings(theProcessData: part_proc.MTKConverter_ProcessData):
+        return (str(theProcessData.myPart.Uuid()), MTKConverter_Report.__ProcessName(theProcessData),
+                dict(theProcessData.myTimings))
 
     def WriteToJSON(self, thePath: str):
         aFile = open(thePath, "w")
@@ -283,15 +333,43 @@ class MTKConverter_Report:
         else:
             aWriter.OpenArraySection("parts")
             for aProcessData in self.__myData:
+                if isinstance(aProcessData, str):
+                    aWriter.WriteRawData(aProcessData)
+                    continue
                 aWriter.OpenSection()
                 MTKConverter_Report.__WritePartProcessData(aWriter, aProcessData)
                 aWriter.CloseSection()
             aWriter.CloseArraySection()
+
+        if self.__myIsWritingTimings:
+            self.__WriteTimings(aWriter)
         aWriter.CloseSection()
 
         aFile.close()
         return True
 
+    # Times are written in seconds
+    def __WriteTimings(self, theWriter: JSONWriter):
+        theWriter.OpenSection("timings")
+        theWriter.WriteData("units", "s")
+        for aStage, aTime in self.__myStageTimes.items():
+            theWriter.WriteData(aStage, f"{aTime:.3f}")
+
+        if not self.__myPartTimings:
+            theWriter.WriteEmptyArray("parts")
+        else:
+            theWriter.OpenArraySection("parts")
+            for aPartId, aProcessName, aTimings in self.__myPartTimings:
+                theWriter.OpenSection()
+                theWriter.WriteData("partId", aPartId)
+                theWriter.WriteData("process", aProcessName)
+                for aStage, aTime in aTimings.items():
+                    theWriter.WriteData(aStage, f"{aTime:.3f}")
+                theWriter.CloseSection()
+            theWriter.CloseArraySection()
+
+        theWriter.CloseSection()
+
     @staticmethod
     def __WriteParameter(theWriter: JSONWriter, theParamName: str, theParamUnits: str, theParamValue):
         theWriter.OpenSection()
@@ -1374,6 +1452,16 @@ class MTKConverter_Report:
         else:
             return "CNC Machining"
 
+    @staticmethod
+    def __ProcessName(theProcessData):
+        if type(theProcessData) is mach_proc.MTKConverter_MachiningData:
+            return MTKConverter_Report.__MachiningProcessName(theProcessData.myOperation)
+        elif type(theProcessData) is wt_proc.MTKConverter_WallThicknessData:
+            return "Wall Thickness Analysis"
+        elif type(theProcessData) is sm_proc.MTKConverter_SheetMetalData:
+            return "Sheet Metal"
+        return "Unrecognized process"
+
     @staticmethod
     def __HasShapes(theBRep: cadex.ModelData_BRepRepresentation, theType):
         aBodyList = theBRep.Get()
@@ -1420,6 +1508,20 @@ class MTKConverter_Report:
 
         theWriter.CloseSection()
 
+    # Writes the machining results or the error message
+    @staticmethod
+    def __WriteMachiningData(theWriter: JSONWriter, theProcessData: mach_proc.MTKConverter_MachiningData):
+        aBRep = theProcessData.myPart.BRepRepresentation()
+        if not theProcessData.myFeatureList.IsEmpty():
+            MTKConverter_Report.__WriteFeatures(theWriter, "Feature Recognition", "featureRecognition",
+                                                theProcessData.myFeatureList, aBRep, "")
+            MTKConverter_Report.__WriteFeatures(theWriter, "Design for Manufacturing", "dfm", theProcessData.myIssueList, aBRep,
+                                                "Part contains no DFM improvement suggestions.")
+        elif (not aBRep) or (not MTKConverter_Report.__HasShapes(aBRep, cadex.ModelData_ST_Solid)):
+            theWriter.WriteData("error", "The part can't be analyzed due to lack of: BRep representation or solids in BRep representation.")
+        else:
+            theWriter.WriteData("error", "An error occurred while processing the part.")
+
     @staticmethod
     def __WritePartProcessData(theWriter: JSONWriter, theProcessData):
         aRes = False
@@ -1428,15 +1530,11 @@ class MTKConverter_Report:
         anErrorMsg = "An error occurred while processing the part."
         if type(theProcessData) is mach_proc.MTKConverter_MachiningData:
             theWriter.WriteData("process", MTKConverter_Report.__MachiningProcessName(theProcessData.myOperation))
-            aBRep = theProcessData.myPart.BRepRepresentation()
-            if not theProcessData.myFeatureList.IsEmpty():
-                MTKConverter_Report.__WriteFeatures(theWriter, "Feature Recognition", "featureRecognition",
-                                                    theProcessData.myFeatureList, aBRep, "")
-                MTKConverter_Report.__WriteFeatures(theWriter, "Design for Manufacturing", "dfm", theProcessData.myIssueList, aBRep,
-                                                    "Part contains no DFM improvement suggestions.")
-                aRes = True
-            elif (not aBRep) or (not MTKConverter_Report.__HasShapes(aBRep, cadex.ModelData_ST_Solid)):
-                anErrorMsg = "The part can't be analyzed due to lack of: BRep representation or solids in BRep representation."
+            if theProcessData.myReportData is not None:
+                theWriter.WriteRawData(theProcessData.myReportData)
+            else:
+                MTKConverter_Report.__WriteMachiningData(theWriter, theProcessData)
+            aRes = True
         elif type(theProcessData) is wt_proc.MTKConverter_WallThicknessData:
             theWriter.WriteData("process", "Wall Thickness Analysis")
             aBRep = theProcessData.myPart.BRepRepresentation()
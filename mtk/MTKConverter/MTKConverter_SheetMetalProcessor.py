@@ -27,6 +27,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import time
+
 import cadexchanger.CadExCore as cadex
 import cadexchanger.CadExMTK  as mtk
 
@@ -68,9 +70,11 @@ class MTKConverter_SheetMetalProcessor(part_proc.MTKConverter_VoidPartProcessor)
         aThickness = aVolume / (aSurfaceArea / 2.0)
         return aThickness
 
-    def __UpdateProcessData(self, theData: mtk.SheetMetal_Data, thePart: cadex.ModelData_Part):
+    # theTime is the time the analyzer spent on recognition and unfolding, which are performed in one pass
+    def __UpdateProcessData(self, theData: mtk.SheetMetal_Data, thePart: cadex.ModelData_Part, theTime: float):
         anSMData = MTKConverter_SheetMetalData(thePart)
         self.myData.append(anSMData)
+        anSMData.AddTime("recognitionAndUnfolding", theTime)
 
         if theData.IsEmpty():
             anSMData.myIsSheetMetalPart = False
@@ -94,7 +98,9 @@ class MTKConverter_SheetMetalProcessor(part_proc.MTKConverter_VoidPartProcessor)
                 anUnfoldedData.myPerimeter = aFlatPattern.Perimeter()
 
         aDFMAnalyzer = mtk.DFMSheetMetal_Analyzer()
+        aStartTime = time.perf_counter()
         anIssueList = aDFMAnalyzer.Perform(theData)
+        anSMData.AddTime("sheetMetalDfm", time.perf_counter() - aStartTime)
         for anIssue in anIssueList:
             if (anUnfoldedData.myIsInit
                 and (mtk.DFMSheetMetal_FlatPatternInterferenceIssue.CompareType(anIssue)
@@ -105,12 +111,14 @@ class MTKConverter_SheetMetalProcessor(part_proc.MTKConverter_VoidPartProcessor)
                 anSMData.myIssueList.Append(anIssue)
 
     def ProcessSolid (self, thePart: cadex.ModelData_Part, theSolid: cadex.ModelData_Solid):
+        aStartTime = time.perf_counter()
         anSMData = self.myAnalyzer.Perform(theSolid, MTKConverter_SheetMetalProcessor.__CalculateInitialThicknessValue (theSolid))
-        self.__UpdateProcessData(anSMData, thePart)
+        self.__UpdateProcessData(anSMData, thePart, time.perf_counter() - aStartTime)
 
     def ProcessShell (self, thePart: cadex.ModelData_Part, theShell: cadex.ModelData_Shell):
+        aStartTime = time.perf_counter()
         anSMData = self.myAnalyzer.Perform(theShell)
-        self.__UpdateProcessData(anSMData, thePart)
+        self.__UpdateProcessData(anSMData, thePart, time.perf_counter() - aStartTime)
 
     def PostPartProcess(self, thePart: cadex.ModelData_Part):
         if not self.myCurrentUnfoldedBRep:
@@ -121,7 +129,9 @@ class MTKConverter_SheetMetalProcessor(part_proc.MTKConverter_VoidPartProcessor)
         anUnfoldedPart.AddRepresentation(self.myCurrentUnfoldedBRep)
 
         aMesher = cadex.ModelAlgo_BRepMesher()
+        aStartTime = time.perf_counter()
         aMesher.Compute(anUnfoldedPart)
+        self.myData[-1].AddTime("unfoldedPartMeshing", time.perf_counter() - aStartTime)
 
         self.myUnfoldedModel.AddRoot(anUnfoldedPart)
         self.myCurrentUnfoldedBRep = cadex.ModelData_BRepRepresentation()
@@ -27,6 +27,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import time
+
 from sys import float_info
 
 import cadexchanger.CadExCore as cadex
@@ -54,9 +56,10 @@ class MTKConverter_WallThicknessProcessor(part_proc.MTKConverter_VoidPartProcess
         self.myAnalyzer = mtk.WallThickness_Analyzer()
         self.myResolution = theResolution
 
-    def __UpdateProcessData(self, theData: mtk.WallThickness_Data, thePart: cadex.ModelData_Part):
+    def __UpdateProcessData(self, theData: mtk.WallThickness_Data, thePart: cadex.ModelData_Part, theTime: float):
         aWTData = MTKConverter_WallThicknessData(thePart)
         self.myData.append(aWTData)
+        aWTData.AddTime("wallThickness", theTime)
 
         if theData.IsEmpty():
             return
@@ -71,10 +74,12 @@ class MTKConverter_WallThicknessProcessor(part_proc.MTKConverter_VoidPartProcess
             theData.PointsOfMaxThickness(aWTData.myMaxThicknessPoints.First, aWTData.myMaxThicknessPoints.Second)
 
     def ProcessSolid(self, thePart: cadex.ModelData_Part, theSolid: cadex.ModelData_Solid):
+        aStartTime = time.perf_counter()
         aWTData = self.myAnalyzer.Perform(theSolid, self.myResolution)
-        self.__UpdateProcessData(aWTData, thePart)
+        self.__UpdateProcessData(aWTData, thePart, time.perf_counter() - aStartTime)
 
     def ProcessMesh (self, thePart: cadex.ModelData_Part, theMesh: cadex.ModelData_IndexedTriangleSet):
+        aStartTime = time.perf_counter()
         aWTData = self.myAnalyzer.Perform(theMesh, self.myResolution)
-        self.__UpdateProcessData(aWTData, thePart)
+        self.__UpdateProcessData(aWTData, thePart, time.perf_counter() - aStartTime)
 
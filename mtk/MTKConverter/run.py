@@ -37,8 +37,10 @@ from pathlib import Path
 
 from MTKConverter import main
 
-aSource = abspath(dirname(Path(__file__).resolve()) + "/../../models/Fresamento_CAM1_v3.stp")
-aProcess = "machining_milling"
-aTarget = abspath(dirname(Path(__file__).resolve()) + "/machining_milling")
+# The guard is required as worker processes may import this script (e.g. on Windows and macOS)
+if __name__ == "__main__":
+    aSource = abspath(dirname(Path(__file__).resolve()) + "/../../models/Fresamento_CAM1_v3.stp")
+    aProcess = "machining_milling"
+    aTarget = abspath(dirname(Path(__file__).resolve()) + "/machining_milling")
 
-sys.exit(main(aSource, aProcess, aTarget))
+    sys.exit(main(aSource, aProcess, aTarget))